@@ -0,0 +1,81 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class ConexoesSQLite:
+    """
+    Uma conexão SQLite por thread para o mesmo arquivo.
+
+    sqlite3 não permite compartilhar conexões entre threads (ex: downloads em paralelo,
+    renovação de lease). As conexões ficam em autocommit e com WAL, para que leitores
+    e um escritor de outros processos não se bloqueiem.
+    """
+
+    def __init__(self, caminho, row_factory=None):
+        self.caminho = caminho
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def obter(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=60, isolation_level=None)
+            if self.row_factory is not None:
+                con.row_factory = self.row_factory
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
+
+
+class LRU:
+    """Dicionário limitado a `tamanho` itens, seguro entre threads; descarta o usado há mais tempo."""
+
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def buscar(self, chave):
+        """Valor da chave (marcada como usada agora), ou None."""
+        with self._lock:
+            if chave not in self._itens:
+                return None
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class InstanciaCompartilhada:
+    """
+    Instância usada por um módulo inteiro (ex: o cache da coleta).
+
+    Criada sob demanda com `fabrica()` (sem argumentos: apenas memória) até que
+    `configurar(...)` a substitua por uma criada com os argumentos informados.
+    """
+
+    def __init__(self, fabrica):
+        self.fabrica = fabrica
+        self._instancia = None
+        self._lock = threading.Lock()
+
+    def configurar(self, *args, **kwargs):
+        instancia = self.fabrica(*args, **kwargs)
+        with self._lock:
+            self._instancia = instancia
+        return instancia
+
+    def obter(self):
+        with self._lock:
+            if self._instancia is None:
+                self._instancia = self.fabrica()
+            return self._instancia
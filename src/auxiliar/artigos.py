@@ -0,0 +1,281 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from auxiliar import proxies
+from auxiliar.armazenamento import ConexoesSQLite
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Conteúdos que indicam que o card da busca não trouxe o texto da notícia
+CONTEUDOS_VAZIOS = {'', 'Conteúdo não encontrado'}
+
+TAGS_BOILERPLATE = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form',
+                    'iframe', 'figure', 'button', 'svg']
+CLASSES_BOILERPLATE = re.compile(r'(menu|nav|footer|header|sidebar|share|social|comment|related|newsletter|'
+                                 r'publicidade|banner|cookie|breadcrumb|tags)', re.IGNORECASE)
+
+TAMANHO_MAXIMO_HTML = 3 * 1024 * 1024
+TAMANHO_MINIMO_PARAGRAFO = 40
+
+# Respostas sem texto com esses status ficam em cache sem prazo; as demais (429, 503,
+# redirecionamento do Google não resolvido...) expiram após o `ttl_negativo` do cache
+STATUS_PERMANENTES = {404, 410}
+
+
+def extrair_texto_principal(html):
+    """
+    Extrai o texto principal de uma página de notícia, removendo menus, rodapés e afins.
+
+    Prefere o corpo marcado (`[itemprop=articleBody]`, `<article>`); sem marcação, usa o
+    elemento com mais texto em parágrafos. Parágrafos muito curtos (legendas, botões)
+    são descartados.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(TAGS_BOILERPLATE):
+        tag.decompose()
+    for tag in soup.find_all(attrs={'class': CLASSES_BOILERPLATE}):
+        if tag.name not in ('body', 'html', 'article'):
+            tag.decompose()
+
+    corpo = soup.select_one('[itemprop="articleBody"]') or soup.find('article')
+    if corpo is None:
+        melhor, maior = None, 0
+        for candidato in soup.find_all(['div', 'section', 'main']):
+            tamanho = sum(len(p.get_text(strip=True)) for p in candidato.find_all('p', recursive=False))
+            if tamanho > maior:
+                melhor, maior = candidato, tamanho
+        corpo = melhor or soup.body or soup
+
+    paragrafos = [p.get_text(' ', strip=True) for p in corpo.find_all('p')]
+    paragrafos = [p for p in paragrafos if len(p) >= TAMANHO_MINIMO_PARAGRAFO]
+    if not paragrafos:
+        return ''
+    return re.sub(r'\s+\n', '\n', "\n".join(dict.fromkeys(paragrafos))).strip()
+
+
+def url_publicador_google(html):
+    """
+    Obtém a URL do publicador a partir da página intermediária do Google News.
+
+    Usa apenas o destino declarado pela página (`data-n-au` ou o link canônico/og:url
+    fora do Google); outros links da página podem ser de assuntos sem relação com a
+    notícia. Retorna None se não for possível (o redirecionamento pode depender de JavaScript).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    tag = soup.select_one('[data-n-au]')
+    if tag is not None:
+        return tag['data-n-au']
+    for seletor, atributo in (('link[rel="canonical"]', 'href'), ('meta[property="og:url"]', 'content')):
+        tag = soup.select_one(seletor)
+        url = (tag.get(atributo) or '').strip() if tag is not None else ''
+        if url.startswith('http') and 'google.' not in urlparse(url).netloc:
+            return url
+    return None
+
+
+class CacheArtigos:
+    """
+    Cache em disco (SQLite) dos artigos baixados.
+
+    URLS mapeia cada URL para o hash do conteúdo baixado; TEXTOS guarda o texto extraído
+    por hash, de forma que a mesma página servida em URLs diferentes é extraída uma vez.
+    URLs que não renderam página (erro temporário, redirecionamento não resolvido) expiram
+    após `ttl_negativo` segundos; só 404/410 ficam em cache sem prazo.
+    """
+
+    def __init__(self, caminho, ttl_negativo=3600):
+        self.caminho = caminho
+        self.ttl_negativo = ttl_negativo
+        self._conexoes = ConexoesSQLite(caminho)
+        con = self._conexoes.obter()
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS URLS (
+                URL TEXT PRIMARY KEY,
+                URL_FINAL TEXT,
+                HASH TEXT,
+                STATUS INTEGER,
+                DAT_DOWNLOAD REAL,
+                EXPIRA REAL
+            );
+            CREATE TABLE IF NOT EXISTS TEXTOS (
+                HASH TEXT PRIMARY KEY,
+                TEXTO TEXT
+            );
+        """)
+        colunas = {row[1] for row in con.execute("PRAGMA table_info(URLS)")}
+        if 'EXPIRA' not in colunas:
+            # Cache criado antes da expiração: as respostas negativas antigas não têm prazo e são descartadas
+            con.execute("ALTER TABLE URLS ADD COLUMN EXPIRA REAL")
+            con.execute("DELETE FROM URLS WHERE HASH IS NULL AND COALESCE(STATUS, 0) NOT IN (%s)"
+                        % ", ".join(map(str, sorted(STATUS_PERMANENTES))))
+        con.execute("DELETE FROM URLS WHERE EXPIRA < ?", (time.time(),))
+
+    def buscar_url(self, url):
+        """Retorna (encontrado, texto) para a URL."""
+        row = self._conexoes.obter().execute("""
+            SELECT U.HASH, T.TEXTO FROM URLS U LEFT JOIN TEXTOS T ON T.HASH = U.HASH
+            WHERE U.URL = ? AND (U.EXPIRA IS NULL OR U.EXPIRA > ?)
+        """, (url, time.time())).fetchone()
+        if row is None:
+            return False, None
+        return True, row[1]
+
+    def buscar_hash(self, hash_conteudo):
+        row = self._conexoes.obter().execute("SELECT TEXTO FROM TEXTOS WHERE HASH = ?", (hash_conteudo,)).fetchone()
+        return row[0] if row else None
+
+    def gravar(self, url, url_final, status, hash_conteudo=None, texto=None):
+        con = self._conexoes.obter()
+        agora = time.time()
+        expira = None
+        if hash_conteudo is not None:
+            con.execute("INSERT OR IGNORE INTO TEXTOS (HASH, TEXTO) VALUES (?, ?)", (hash_conteudo, texto))
+        elif status not in STATUS_PERMANENTES:
+            expira = agora + self.ttl_negativo
+        con.execute("INSERT OR REPLACE INTO URLS (URL, URL_FINAL, HASH, STATUS, DAT_DOWNLOAD, EXPIRA) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (url, url_final, hash_conteudo, status, agora, expira))
+
+
+class BuscadorArtigos:
+    """
+    Baixa e extrai o texto de artigos em paralelo, com limite de conexões por host.
+
+    Todos os itens do Google News passam primeiro pela página intermediária em
+    news.google.com; esse salto tem o seu próprio limite (`por_host_google`), para que
+    o limite por site dos publicadores não reduza toda a etapa a `por_host` downloads.
+    """
+
+    def __init__(self, cache=None, max_workers=16, por_host=2, timeout=15, por_host_google=8):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.por_host = por_host
+        self.por_host_google = por_host_google
+        self.timeout = timeout
+        self._semaforos = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.estatisticas = {'cache_url': 0, 'cache_conteudo': 0, 'baixados': 0, 'erros': 0, 'sem_texto': 0}
+
+    def _sessao(self):
+        sessao = getattr(self._local, 'sessao', None)
+        if sessao is None:
+            sessao = requests.Session()
+            sessao.headers.update({'User-Agent': USER_AGENT, 'Accept-Language': 'pt-BR,pt;q=0.9'})
+            adaptador = HTTPAdapter(pool_connections=self.max_workers,
+                                    pool_maxsize=max(self.por_host, self.por_host_google))
+            sessao.mount('http://', adaptador)
+            sessao.mount('https://', adaptador)
+            self._local.sessao = sessao
+        return sessao
+
+    def _semaforo(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaforos:
+                limite = self.por_host_google if host.endswith('news.google.com') else self.por_host
+                self._semaforos[host] = threading.BoundedSemaphore(limite)
+            return self._semaforos[host]
+
+    def _contar(self, chave):
+        with self._lock:
+            self.estatisticas[chave] += 1
+
+    def _baixar(self, url):
+        with self._semaforo(url):
+            resp = proxies.requisitar(self._sessao().get, url, timeout=self.timeout, allow_redirects=True, stream=True)
+            try:
+                tipo = resp.headers.get('Content-Type', '')
+                if resp.status_code != 200 or 'html' not in tipo:
+                    return resp.url, resp.status_code, None
+                # Bytes brutos: o BeautifulSoup detecta a codificação pelo <meta charset>
+                return resp.url, resp.status_code, resp.raw.read(TAMANHO_MAXIMO_HTML, decode_content=True)
+            finally:
+                resp.close()
+
+    def buscar(self, url):
+        """Retorna o texto principal do artigo em `url`, ou None."""
+        if self.cache is not None:
+            encontrado, texto = self.cache.buscar_url(url)
+            if encontrado:
+                self._contar('cache_url')
+                return texto
+
+        try:
+            url_final, status, corpo = self._baixar(url)
+            if corpo is not None and urlparse(url_final).netloc.endswith('news.google.com'):
+                url_publicador = url_publicador_google(corpo)
+                if url_publicador:
+                    url_final, status, corpo = self._baixar(url_publicador)
+                else:
+                    corpo = None
+        except Exception as e:
+            self._contar('erros')
+            logger.debug("Erro ao baixar artigo %s: %s", url, e)
+            return None
+
+        self._contar('baixados')
+        if corpo is None:
+            self._contar('sem_texto')
+            if self.cache is not None:
+                self.cache.gravar(url, url_final, status)
+            return None
+
+        hash_conteudo = hashlib.sha256(corpo).hexdigest()
+        texto = self.cache.buscar_hash(hash_conteudo) if self.cache is not None else None
+        if texto is not None:
+            self._contar('cache_conteudo')
+        else:
+            texto = extrair_texto_principal(corpo)
+        if not texto:
+            self._contar('sem_texto')
+        if self.cache is not None:
+            self.cache.gravar(url, url_final, status, hash_conteudo, texto)
+        return texto or None
+
+    def buscar_varios(self, urls):
+        """Busca vários artigos em paralelo. Retorna dict url -> texto (ou None)."""
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(urls, executor.map(self.buscar, urls)))
+
+
+def enriquecer_noticias(news, buscador, apenas_sem_conteudo=True):
+    """
+    Substitui o 'conteudo' das notícias pelo texto completo do artigo.
+
+    Args:
+        news (list): Lista de notícias (Noticia), alterada no próprio objeto.
+        buscador (BuscadorArtigos): Buscador configurado.
+        apenas_sem_conteudo (bool): Se True, busca só notícias cujo card não trouxe conteúdo.
+
+    Returns:
+        set: Links das notícias que receberam o texto completo.
+    """
+    alvos = [noticia for noticia in news
+             if noticia.link and (not apenas_sem_conteudo or str(noticia.conteudo or '').strip() in CONTEUDOS_VAZIOS)]
+    if not alvos:
+        return set()
+
+    inicio = time.monotonic()
+    textos = buscador.buscar_varios(noticia.link for noticia in alvos)
+    enriquecidos = set()
+    for noticia in alvos:
+        texto = textos.get(noticia.link)
+        if texto:
+            noticia.conteudo = texto
+            enriquecidos.add(noticia.link)
+
+    logger.info("Artigos completos: %s de %s notícias em %.1fs %s", len(enriquecidos), len(alvos),
+                time.monotonic() - inicio, buscador.estatisticas)
+    return enriquecidos
@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from auxiliar.armazenamento import LRU, ConexoesSQLite, InstanciaCompartilhada
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Entradas vencidas há mais tempo que isso são removidas ao abrir o cache
+RETENCAO_VENCIDAS = 30 * 86400
+
+
+def calcular_expiracao(cabecalhos, agora, ttl_padrao, ttl_maximo):
+    """
+    Instante de expiração a partir de Cache-Control/Expires/Age.
+    Retorna None quando a resposta não pode ser armazenada (no-store).
+    """
+    diretivas = {}
+    for parte in (cabecalhos.get('Cache-Control') or '').lower().split(','):
+        chave, _, valor = parte.strip().partition('=')
+        if chave:
+            diretivas[chave] = valor.strip().strip('"')
+    if 'no-store' in diretivas:
+        return None
+    if 'no-cache' in diretivas:
+        return agora
+
+    try:
+        idade = int(cabecalhos.get('Age') or 0)
+    except ValueError:
+        idade = 0
+
+    ttl = None
+    for chave in ('s-maxage', 'max-age'):
+        if chave in diretivas:
+            try:
+                ttl = int(diretivas[chave]) - idade
+                break
+            except ValueError:
+                pass
+    if ttl is None and cabecalhos.get('Expires'):
+        try:
+            ttl = parsedate_to_datetime(cabecalhos['Expires']).timestamp() - agora
+        except (TypeError, ValueError):
+            # Expires inválido (ex: "0") equivale a já expirado
+            ttl = 0
+    if ttl is None:
+        ttl = ttl_padrao
+    return agora + max(0, min(ttl, ttl_maximo))
+
+
+class EntradaHTTP:
+    """Metadados de uma resposta: URL final, status, Content-Type, validadores e expiração."""
+
+    __slots__ = ('url_final', 'status', 'content_type', 'etag', 'last_modified', 'expira', 'valida')
+
+    def __init__(self, url_final, status, content_type, etag, last_modified, expira, valida):
+        self.url_final = url_final
+        self.status = status
+        self.content_type = content_type
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expira = expira
+        self.valida = valida
+
+    def como_tupla(self):
+        return tuple(getattr(self, campo) for campo in self.__slots__)
+
+
+class CacheHTTP:
+    """
+    Cache persistente dos metadados das respostas da validação de imagens (HEAD).
+
+    Respostas válidas ficam em cache pelo tempo indicado em Cache-Control/Expires
+    (ou `ttl_padrao`); depois disso, se houver ETag/Last-Modified, a URL é revalidada
+    com requisição condicional (304 renova a entrada sem baixar nada). Respostas
+    rejeitadas e erros de rede ficam em cache por `ttl_negativo`.
+
+    Em memória (LRU) e, com `caminho`, em SQLite no disco entre execuções.
+    """
+
+    def __init__(self, caminho=None, tamanho_lru=50000, ttl_padrao=86400, ttl_negativo=900,
+                 ttl_maximo=7 * 86400):
+        self.caminho = caminho
+        self.ttl_padrao = ttl_padrao
+        self.ttl_negativo = ttl_negativo
+        self.ttl_maximo = ttl_maximo
+        self._lru = LRU(tamanho_lru)
+        self._lock = threading.Lock()
+        self._conexoes = ConexoesSQLite(caminho)
+        self.estatisticas = {'validos': 0, 'negativos': 0, 'revalidados': 0, 'requisicoes': 0, 'erros': 0}
+        if caminho:
+            con = self._conexoes.obter()
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS RESPOSTAS_HTTP (
+                    URL TEXT PRIMARY KEY,
+                    URL_FINAL TEXT,
+                    STATUS INTEGER,
+                    CONTENT_TYPE TEXT,
+                    ETAG TEXT,
+                    LAST_MODIFIED TEXT,
+                    EXPIRA REAL NOT NULL,
+                    VALIDA INTEGER NOT NULL
+                )
+            """)
+            con.execute("DELETE FROM RESPOSTAS_HTTP WHERE EXPIRA < ?", (time.time() - RETENCAO_VENCIDAS,))
+
+    def buscar(self, url):
+        """Entrada em cache para a URL (vencida ou não), ou None."""
+        entrada = self._lru.buscar(url)
+        if entrada is not None:
+            return entrada
+        if self.caminho:
+            row = self._conexoes.obter().execute(
+                "SELECT URL_FINAL, STATUS, CONTENT_TYPE, ETAG, LAST_MODIFIED, EXPIRA, VALIDA "
+                "FROM RESPOSTAS_HTTP WHERE URL = ?", (url,)
+            ).fetchone()
+            if row is not None:
+                entrada = EntradaHTTP(*row[:-1], bool(row[-1]))
+                self._lru.guardar(url, entrada)
+                return entrada
+        return None
+
+    def gravar(self, url, entrada):
+        self._lru.guardar(url, entrada)
+        if self.caminho:
+            self._conexoes.obter().execute(
+                "INSERT OR REPLACE INTO RESPOSTAS_HTTP "
+                "(URL, URL_FINAL, STATUS, CONTENT_TYPE, ETAG, LAST_MODIFIED, EXPIRA, VALIDA) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, *entrada.como_tupla()[:-1], int(entrada.valida))
+            )
+
+    def _contar(self, chave):
+        with self._lock:
+            self.estatisticas[chave] += 1
+
+    def validar_imagem(self, url, requisitar):
+        """
+        URL final se a URL aponta para uma imagem (HTTP 200 com Content-Type image/*), senão None.
+
+        `requisitar(cabecalhos)` faz o HEAD (seguindo redirecionamentos) e retorna a resposta.
+        """
+        agora = time.time()
+        entrada = self.buscar(url)
+        if entrada is not None and entrada.expira > agora:
+            self._contar('validos' if entrada.valida else 'negativos')
+            return entrada.url_final if entrada.valida else None
+
+        cabecalhos = {'User-Agent': USER_AGENT}
+        if entrada is not None and entrada.valida:
+            if entrada.etag:
+                cabecalhos['If-None-Match'] = entrada.etag
+            if entrada.last_modified:
+                cabecalhos['If-Modified-Since'] = entrada.last_modified
+
+        self._contar('requisicoes')
+        try:
+            resp = requisitar(cabecalhos)
+        except Exception as e:
+            self._contar('erros')
+            logger.debug("  IMG ERRO HEAD: %s url=%s", e, url)
+            self.gravar(url, EntradaHTTP(None, 0, '', None, None, agora + self.ttl_negativo, False))
+            return None
+
+        if resp.status_code == 304 and entrada is not None and len(cabecalhos) > 1:
+            self._contar('revalidados')
+            expira = calcular_expiracao(resp.headers, agora, self.ttl_padrao, self.ttl_maximo)
+            entrada.expira = agora if expira is None else expira
+            self.gravar(url, entrada)
+            return entrada.url_final
+
+        content_type = resp.headers.get('Content-Type', '')
+        valida = resp.status_code == 200 and content_type.startswith('image/')
+        if valida:
+            expira = calcular_expiracao(resp.headers, agora, self.ttl_padrao, self.ttl_maximo)
+        else:
+            logger.debug("  IMG REJEITADA: status=%s type=%s url=%s", resp.status_code, content_type, url)
+            expira = agora + self.ttl_negativo
+        if expira is not None:
+            self.gravar(url, EntradaHTTP(
+                resp.url if valida else None, resp.status_code, content_type, resp.headers.get('ETag'),
+                resp.headers.get('Last-Modified'), expira, valida
+            ))
+        return resp.url if valida else None
+
+    def resumo(self):
+        e = self.estatisticas
+        sem_requisicao = e['validos'] + e['negativos']
+        total = sem_requisicao + e['requisicoes']
+        taxa = (sem_requisicao / total * 100) if total else 0.0
+        return (f"{sem_requisicao}/{total} sem requisição ({taxa:.1f}%) - válidas: {e['validos']}, "
+                f"negativas: {e['negativos']}, requisições: {e['requisicoes']} "
+                f"(revalidadas com 304: {e['revalidados']}, erros: {e['erros']})")
+
+
+# Instância usada pela coleta; apenas memória até que `configurar` defina o arquivo em disco
+_compartilhado = InstanciaCompartilhada(CacheHTTP)
+
+
+def configurar(caminho=None, **kwargs):
+    """Define o cache usado por `validar_imagem` (caminho None mantém apenas o nível em memória)."""
+    return _compartilhado.configurar(caminho, **kwargs)
+
+
+def obter():
+    return _compartilhado.obter()
+
+
+def validar_imagem(url, requisitar):
+    return obter().validar_imagem(url, requisitar)
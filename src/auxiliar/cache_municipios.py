@@ -0,0 +1,139 @@
+import hashlib
+import inspect
+import json
+import logging
+import re
+import threading
+
+import auxiliar.definicoes as definicoes
+import auxiliar.spacy_extract as spacy_extract
+from auxiliar.armazenamento import LRU, ConexoesSQLite, InstanciaCompartilhada
+
+logger = logging.getLogger(__name__)
+
+
+def calcular_versao():
+    """
+    Versão das regras de identificação de municípios.
+
+    Combina o gazetteer (nomes e códigos), PALAVRAS_AMBIGUAS, a lista do matcher, o
+    modelo spaCy e o código-fonte das funções de regras. Qualquer alteração nesses
+    itens muda a versão e invalida as entradas antigas do cache.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps(sorted(definicoes.MUNICIPIO_LOOKUP.items()), ensure_ascii=False).encode('utf-8'))
+    h.update(json.dumps(sorted(definicoes.PALAVRAS_AMBIGUAS), ensure_ascii=False).encode('utf-8'))
+    h.update(json.dumps(spacy_extract.municipios_bahia, ensure_ascii=False).encode('utf-8'))
+    meta = getattr(spacy_extract.nlp, 'meta', {}) or {}
+    h.update(f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}".encode('utf-8'))
+    for funcao in (definicoes.normalize_text,
+                   definicoes.pre_process_text_for_municipality_detection,
+                   definicoes.is_geographical_context,
+                   definicoes.should_ignore_municipality,
+                   definicoes.get_municipios_from_title,
+                   spacy_extract.extrair_municipios):
+        h.update(inspect.getsource(funcao).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def _normalizar(texto):
+    # Mesmo pré-processamento aplicado na extração, mais a compactação de espaços
+    texto = definicoes.pre_process_text_for_municipality_detection(texto)
+    return re.sub(r'\s+', ' ', texto).strip()
+
+
+class CacheMunicipios:
+    """
+    Cache em dois níveis do resultado de get_municipios_from_title.
+
+    Nível 1: LRU em memória no processo. Nível 2 (opcional): SQLite em disco, que
+    sobrevive entre execuções. A chave é o hash do título e do conteúdo normalizados,
+    e cada entrada é marcada com a versão das regras (ver `calcular_versao`).
+    """
+
+    def __init__(self, caminho=None, tamanho_lru=20000):
+        self.caminho = caminho
+        self.versao = calcular_versao()
+        self._lru = LRU(tamanho_lru)
+        self._lock = threading.Lock()
+        self._conexoes = ConexoesSQLite(caminho)
+        self.estatisticas = {'memoria': 0, 'disco': 0, 'extraidos': 0}
+        if caminho:
+            con = self._conexoes.obter()
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS MUNICIPIOS_EXTRAIDOS (
+                    CHAVE TEXT PRIMARY KEY,
+                    VERSAO TEXT NOT NULL,
+                    RESULTADO TEXT NOT NULL
+                )
+            """)
+            removidas = con.execute("DELETE FROM MUNICIPIOS_EXTRAIDOS WHERE VERSAO <> ?", (self.versao,)).rowcount
+            if removidas:
+                logger.info("Cache de municípios: %s entradas de versões anteriores removidas.", removidas)
+
+    def chave(self, titulo, conteudo, incluir_conteudo=False):
+        dados = "\x1f".join((_normalizar(titulo), _normalizar(conteudo), '1' if incluir_conteudo else '0'))
+        return hashlib.sha256(dados.encode('utf-8')).hexdigest()
+
+    def buscar(self, chave):
+        """Retorna a lista de municípios em cache para a chave, ou None."""
+        resultado = self._lru.buscar(chave)
+        if resultado is not None:
+            with self._lock:
+                self.estatisticas['memoria'] += 1
+            return list(resultado)
+        if self.caminho:
+            row = self._conexoes.obter().execute(
+                "SELECT RESULTADO FROM MUNICIPIOS_EXTRAIDOS WHERE CHAVE = ? AND VERSAO = ?", (chave, self.versao)
+            ).fetchone()
+            if row is not None:
+                resultado = json.loads(row[0])
+                self._lru.guardar(chave, tuple(resultado))
+                with self._lock:
+                    self.estatisticas['disco'] += 1
+                return resultado
+        return None
+
+    def gravar(self, chave, resultado):
+        self._lru.guardar(chave, tuple(resultado))
+        with self._lock:
+            self.estatisticas['extraidos'] += 1
+        if self.caminho:
+            self._conexoes.obter().execute(
+                "INSERT OR REPLACE INTO MUNICIPIOS_EXTRAIDOS (CHAVE, VERSAO, RESULTADO) VALUES (?, ?, ?)",
+                (chave, self.versao, json.dumps(resultado, ensure_ascii=False))
+            )
+
+    def extrair(self, titulo, conteudo, incluir_conteudo=False):
+        """get_municipios_from_title com cache."""
+        chave = self.chave(titulo, conteudo, incluir_conteudo)
+        resultado = self.buscar(chave)
+        if resultado is None:
+            resultado = definicoes.get_municipios_from_title(titulo, conteudo, incluir_conteudo)
+            self.gravar(chave, resultado)
+        return resultado
+
+    def resumo(self):
+        acertos = self.estatisticas['memoria'] + self.estatisticas['disco']
+        total = acertos + self.estatisticas['extraidos']
+        taxa = (acertos / total * 100) if total else 0.0
+        return (f"{acertos}/{total} acertos ({taxa:.1f}%) - memória: {self.estatisticas['memoria']}, "
+                f"disco: {self.estatisticas['disco']}, extraídos: {self.estatisticas['extraidos']}")
+
+
+# Instância usada pela coleta; apenas memória até que `configurar` defina o arquivo em disco
+_compartilhado = InstanciaCompartilhada(CacheMunicipios)
+
+
+def configurar(caminho=None, tamanho_lru=20000):
+    """Define o cache usado por `extrair` (caminho None mantém apenas o nível em memória)."""
+    return _compartilhado.configurar(caminho, tamanho_lru=tamanho_lru)
+
+
+def obter():
+    return _compartilhado.obter()
+
+
+def extrair(titulo, conteudo, incluir_conteudo=False):
+    """Identifica os municípios de uma notícia usando o cache configurado."""
+    return obter().extrair(titulo, conteudo, incluir_conteudo)
@@ -1,8 +1,15 @@
+import hashlib
+import logging
+from collections import Counter
+from datetime import date, datetime
+
 import oracledb
 
+logger = logging.getLogger(__name__)
+
 def abrirConexao(db_user, db_password, db_encoding, db_host):
     try:
-        print(f"Conectando ao banco de dados: {db_host} como {db_user}")
+        logger.info("Conectando ao banco de dados: %s como %s", db_host, db_user)
         con = oracledb.connect(
             db_user,
             db_password,
@@ -12,19 +19,50 @@ def abrirConexao(db_user, db_password, db_encoding, db_host):
         return con
     except oracledb.DatabaseError as e:
         error, = e.args
-        print(f"Erro ao conectar no banco: (Código: {error.code} - {error.message})")
+        logger.error("Erro ao conectar no banco: (Código: %s - %s)", error.code, error.message)
+        return None
+
+def criar_pool(db_user, db_password, db_encoding, db_host, minimo=1, maximo=4):
+    """
+    Cria um pool de conexões (oracledb.create_pool). As conexões são obtidas com
+    `pool.acquire()` e devolvidas com `pool.release(con)`; com todas em uso, `acquire` aguarda.
+    O encoding é sempre UTF-8 no python-oracledb (`db_encoding` é mantido pela compatibilidade).
+    """
+    try:
+        logger.info("Criando pool de conexões (%s a %s) em %s como %s", minimo, maximo, db_host, db_user)
+        return oracledb.create_pool(
+            user=db_user,
+            password=db_password,
+            dsn=db_host,
+            min=minimo,
+            max=maximo,
+            increment=1,
+            getmode=oracledb.POOL_GETMODE_WAIT
+        )
+    except oracledb.DatabaseError as e:
+        error, = e.args
+        logger.error("Erro ao criar o pool de conexões: (Código: %s - %s)", error.code, error.message)
         return None
 
+TABELAS = ('LOG_EXECUCAO_NOTICIAS', 'NOTICIAS_MUNICIPIOS', 'MENCOES_MUNICIPIOS', 'RESUMO_MUNICIPIOS')
+
+# No Oracle '' é NULL; usado no lugar de palavra-chave/fonte vazias nas chaves das menções e do resumo
+SEM_VALOR = '-'
+
+# Agrupamentos aceitos por consultar_resumo (formato do TRUNC do Oracle)
+PERIODOS = {'dia': 'DD', 'semana': 'IW', 'mes': 'MM', 'ano': 'YYYY'}
+
 def verificar_tabelas(conn):
     """
-    Verifica se a tabela principal de notícias e a tabela de log existem.
+    Verifica se as tabelas de notícias, de log, de menções e de resumo existem.
     Levanta uma exceção se não existirem, instruindo o usuário.
     """
     cur = conn.cursor()
     try:
-        cur.execute("SELECT TABLE_NAME FROM USER_TABLES WHERE TABLE_NAME IN ('NOTICIAS_MUNICIPIOS', 'LOG_EXECUCAO_NOTICIAS')")
+        cur.execute("SELECT TABLE_NAME FROM USER_TABLES WHERE TABLE_NAME IN "
+                    "('NOTICIAS_MUNICIPIOS', 'LOG_EXECUCAO_NOTICIAS', 'MENCOES_MUNICIPIOS', 'RESUMO_MUNICIPIOS')")
         tabelas = [row[0] for row in cur.fetchall()]
-        if 'NOTICIAS_MUNICIPIOS' not in tabelas or 'LOG_EXECUCAO_NOTICIAS' not in tabelas:
+        if any(t not in tabelas for t in TABELAS):
             raise Exception("As tabelas necessárias para o sistema não foram encontradas no banco de dados. Por favor, execute o script com a flag --gerar-banco para criar a estrutura necessária.")
     finally:
         cur.close()
@@ -49,13 +87,13 @@ def criar_tabelas(conn):
                 STATUS VARCHAR2(50) DEFAULT 'EM ANDAMENTO'
             )
         """)
-        print("Tabela LOG_EXECUCAO_NOTICIAS criada com sucesso.")
+        logger.info("Tabela LOG_EXECUCAO_NOTICIAS criada com sucesso.")
     except oracledb.DatabaseError as e:
         error, = e.args
         if error.code == 955: 
-            print("Tabela LOG_EXECUCAO_NOTICIAS já existe.")
+            logger.info("Tabela LOG_EXECUCAO_NOTICIAS já existe.")
         else:
-            print(f"Erro ao criar tabela LOG_EXECUCAO_NOTICIAS: {error.message}")
+            logger.error("Erro ao criar tabela LOG_EXECUCAO_NOTICIAS: %s", error.message)
 
     # Tabela de Notícias
     try:
@@ -75,17 +113,67 @@ def criar_tabelas(conn):
                 CONSTRAINT FK_LOG_EXEC FOREIGN KEY (IDE_EXECUCAO) REFERENCES LOG_EXECUCAO_NOTICIAS(IDE_EXECUCAO)
             )
         """)
-        print("Tabela NOTICIAS_MUNICIPIOS criada com sucesso.")
+        logger.info("Tabela NOTICIAS_MUNICIPIOS criada com sucesso.")
     except oracledb.DatabaseError as e:
         error, = e.args
         if error.code == 955:
-            print("Tabela NOTICIAS_MUNICIPIOS já existe.")
+            logger.info("Tabela NOTICIAS_MUNICIPIOS já existe.")
         else:
-            print(f"Erro ao criar tabela NOTICIAS_MUNICIPIOS: {error.message}")
-            
+            logger.error("Erro ao criar tabela NOTICIAS_MUNICIPIOS: %s", error.message)
+
+    # Menções normalizadas: uma linha por notícia (link) e código IBGE em cada palavra-chave
+    _criar_objeto(cur, "Tabela MENCOES_MUNICIPIOS", """
+        CREATE TABLE MENCOES_MUNICIPIOS (
+            HASH_LINK VARCHAR2(40) NOT NULL,
+            COD_IBGE VARCHAR2(7) NOT NULL,
+            PALAVRA_CHAVE VARCHAR2(255) NOT NULL,
+            FONTE VARCHAR2(255) NOT NULL,
+            DAT_REFERENCIA DATE NOT NULL,
+            IDE_NOTICIA NUMBER,
+            IDE_EXECUCAO NUMBER,
+            CONSTRAINT PK_MENCOES_MUNICIPIOS PRIMARY KEY (HASH_LINK, COD_IBGE, PALAVRA_CHAVE),
+            CONSTRAINT FK_MENCAO_NOTICIA FOREIGN KEY (IDE_NOTICIA) REFERENCES NOTICIAS_MUNICIPIOS(IDE_NOTICIA)
+        )
+    """)
+    _criar_objeto(cur, "Índice IDX_MENCOES_MUNICIPIO_DATA",
+                  "CREATE INDEX IDX_MENCOES_MUNICIPIO_DATA ON MENCOES_MUNICIPIOS (COD_IBGE, DAT_REFERENCIA)")
+    _criar_objeto(cur, "Índice IDX_MENCOES_PALAVRA_DATA",
+                  "CREATE INDEX IDX_MENCOES_PALAVRA_DATA ON MENCOES_MUNICIPIOS (PALAVRA_CHAVE, DAT_REFERENCIA)")
+    _criar_objeto(cur, "Índice IDX_MENCOES_NOTICIA",
+                  "CREATE INDEX IDX_MENCOES_NOTICIA ON MENCOES_MUNICIPIOS (IDE_NOTICIA)")
+
+    # Resumo diário, atualizado incrementalmente por salvar_noticias
+    _criar_objeto(cur, "Tabela RESUMO_MUNICIPIOS", """
+        CREATE TABLE RESUMO_MUNICIPIOS (
+            COD_IBGE VARCHAR2(7) NOT NULL,
+            PALAVRA_CHAVE VARCHAR2(255) NOT NULL,
+            FONTE VARCHAR2(255) NOT NULL,
+            DAT_REFERENCIA DATE NOT NULL,
+            QTD_NOTICIAS NUMBER DEFAULT 0 NOT NULL,
+            DAT_ATUALIZACAO TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT PK_RESUMO_MUNICIPIOS PRIMARY KEY (COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA)
+        )
+    """)
+    _criar_objeto(cur, "Índice IDX_RESUMO_PALAVRA_DATA",
+                  "CREATE INDEX IDX_RESUMO_PALAVRA_DATA ON RESUMO_MUNICIPIOS (PALAVRA_CHAVE, DAT_REFERENCIA)")
+    _criar_objeto(cur, "Índice IDX_RESUMO_DATA",
+                  "CREATE INDEX IDX_RESUMO_DATA ON RESUMO_MUNICIPIOS (DAT_REFERENCIA)")
+
     conn.commit()
     cur.close()
 
+def _criar_objeto(cur, descricao, ddl):
+    """Executa um CREATE ignorando objetos que já existem (ORA-00955 / ORA-01408)."""
+    try:
+        cur.execute(ddl)
+        logger.info("%s criado(a) com sucesso.", descricao)
+    except oracledb.DatabaseError as e:
+        error, = e.args
+        if error.code in (955, 1408):
+            logger.info("%s já existe.", descricao)
+        else:
+            logger.error("Erro ao criar %s: %s", descricao, error.message)
+
 def registrar_inicio(conn, des_procedure, des_assunto):
     """
     Guarda o registro de início da execução e retorna o ID da execução.
@@ -100,7 +188,7 @@ def registrar_inicio(conn, des_procedure, des_assunto):
         conn.commit()
         return ide_execucao.getvalue()[0]
     except Exception as e:
-        print(f"Erro ao registrar início no banco: {e}")
+        logger.error("Erro ao registrar início no banco: %s", e)
         return None
     finally:
         cur.close()
@@ -119,7 +207,7 @@ def registrar_fim(ide_execucao, conn):
         """, (ide_execucao,))
         conn.commit()
     except Exception as e:
-        print(f"Erro ao registrar fim no banco: {e}")
+        logger.error("Erro ao registrar fim no banco: %s", e)
     finally:
         cur.close()
 
@@ -139,45 +227,255 @@ def registrar_erro(ide_execucao, erro_msg, conn):
         """, (erro_msg_truncada, ide_execucao))
         conn.commit()
     except Exception as e:
-        print(f"Erro ao registrar erro no banco: {e}")
+        logger.error("Erro ao registrar erro no banco: %s", e)
     finally:
         cur.close()
 
-def salvar_noticias(conn, df, ide_execucao):
+def _data_referencia(data_publicacao):
+    """Data de publicação ('dd/mm/aaaa') como date; sem data válida, usa o dia da captura."""
+    try:
+        return datetime.strptime(str(data_publicacao).strip(), '%d/%m/%Y').date()
+    except ValueError:
+        return date.today()
+
+def _hash_link(link):
+    return hashlib.sha1(str(link).encode('utf-8')).hexdigest()
+
+def salvar_noticias(conn, dados, ide_execucao):
     """
-    Salva os registros formatados do dataframe na tabela de notícias.
+    Salva as notícias formatadas na tabela de notícias.
+
+    `dados` pode ser um dict de colunas (ver auxiliar.registros.expandir_municipios)
+    ou um DataFrame com as mesmas colunas. Os registros são montados coluna a coluna.
+
+    Na mesma transação, grava as menções (MENCOES_MUNICIPIOS, uma por link e código
+    IBGE em cada palavra-chave) e soma as menções novas ao RESUMO_MUNICIPIOS. Uma
+    notícia coletada de novo em outra execução não é contada duas vezes no resumo.
+
+    Em caso de erro a transação é desfeita e a exceção é propagada, para que quem grava
+    (ex: GravadorBanco, em segundo plano) saiba que o lote foi perdido.
     """
-    if df is None or df.empty:
+    if dados is None:
         return
-    
+    if not isinstance(dados, dict):
+        dados = {coluna: dados[coluna].tolist() for coluna in dados.columns}
+
+    total = len(next(iter(dados.values()), []))
+    if total == 0:
+        return
+
+    def coluna(nome, limite=None):
+        valores = dados.get(nome) or [''] * total
+        return [str(v)[:limite] if limite else str(v) for v in valores]
+
     cur = conn.cursor()
     try:
         sql = """
             INSERT INTO NOTICIAS_MUNICIPIOS 
             (IDE_EXECUCAO, TITULO, CONTEUDO, FONTE, DAT_PUBLICACAO, LINK, IMG_URL, PALAVRA_CHAVE, MUNICIPIOS_CITADOS)
             VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
+            RETURNING IDE_NOTICIA INTO :10
         """
-        
-        # Converte o dataframe para uma lista de tuplas
-        registros = []
-        for index, row in df.iterrows():
-            registros.append((
-                ide_execucao,
-                str(row.get('titulo', ''))[:1500],
-                str(row.get('conteudo', '')),
-                str(row.get('fonte', ''))[:255],
-                str(row.get('datetime', ''))[:100],
-                str(row.get('link', ''))[:2000],
-                str(row.get('img_url', ''))[:2000],
-                str(row.get('palavra_chave', ''))[:255],
-                str(row.get('municipios_citados', ''))[:2000]
-            ))
-            
+
+        fontes = coluna('fonte', 255)
+        datas = coluna('datetime', 100)
+        links = coluna('link', 2000)
+        palavras = coluna('palavra_chave', 255)
+
+        # Monta as tuplas a partir das colunas, sem iterar linha a linha no DataFrame
+        registros = list(zip(
+            [ide_execucao] * total,
+            coluna('titulo', 1500),
+            coluna('conteudo'),
+            fontes,
+            datas,
+            links,
+            coluna('img_url', 2000),
+            palavras,
+            coluna('municipios_citados', 2000)
+        ))
+
+        ides_noticia = cur.var(oracledb.NUMBER, arraysize=total)
+        cur.setinputsizes(*([None] * 9), ides_noticia)
         cur.executemany(sql, registros)
+
+        novas = _registrar_mencoes(cur, coluna('codigo_municipio', 7), fontes, datas, links, palavras,
+                                   ides_noticia, ide_execucao)
+        conn.commit()
+        logger.info("✅ %s notícias persistidas no banco de dados com sucesso (%s menções novas).",
+                    len(registros), novas)
+    except Exception as e:
+        logger.error("Erro ao salvar notícias no banco: %s", e)
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+def _registrar_mencoes(cur, codigos, fontes, datas, links, palavras, ides_noticia, ide_execucao):
+    """Insere as menções e soma ao resumo apenas as que ainda não existiam. Retorna quantas eram novas."""
+    mencoes = []
+    for i, codigo in enumerate(codigos):
+        codigo = codigo.strip()
+        if not codigo:
+            continue
+        ide_noticia = ides_noticia.getvalue(i)
+        mencoes.append((
+            _hash_link(links[i]), codigo, palavras[i] or SEM_VALOR, fontes[i] or SEM_VALOR,
+            _data_referencia(datas[i]), ide_noticia[0] if ide_noticia else None, ide_execucao
+        ))
+    if not mencoes:
+        return 0
+
+    # Menções já gravadas (mesmo link, município e palavra-chave) violam a PK e são ignoradas
+    cur.executemany("""
+        INSERT INTO MENCOES_MUNICIPIOS
+        (HASH_LINK, COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA, IDE_NOTICIA, IDE_EXECUCAO)
+        VALUES (:1, :2, :3, :4, :5, :6, :7)
+    """, mencoes, batcherrors=True)
+    repetidas = set()
+    for erro in cur.getbatcherrors():
+        if erro.code != 1:
+            raise oracledb.DatabaseError(erro)
+        repetidas.add(erro.offset)
+
+    contagens = Counter(
+        (codigo, palavra, fonte, dia)
+        for i, (_, codigo, palavra, fonte, dia, _, _) in enumerate(mencoes)
+        if i not in repetidas
+    )
+    if contagens:
+        linhas = [(*chave, qtd) for chave, qtd in contagens.items()]
+        cur.executemany("""
+            MERGE INTO RESUMO_MUNICIPIOS r
+            USING (SELECT :1 AS COD_IBGE, :2 AS PALAVRA_CHAVE, :3 AS FONTE, :4 AS DAT_REFERENCIA, :5 AS QTD FROM DUAL) n
+            ON (r.COD_IBGE = n.COD_IBGE AND r.PALAVRA_CHAVE = n.PALAVRA_CHAVE
+                AND r.FONTE = n.FONTE AND r.DAT_REFERENCIA = n.DAT_REFERENCIA)
+            WHEN MATCHED THEN UPDATE SET r.QTD_NOTICIAS = r.QTD_NOTICIAS + n.QTD, r.DAT_ATUALIZACAO = CURRENT_TIMESTAMP
+            WHEN NOT MATCHED THEN INSERT (COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA, QTD_NOTICIAS)
+                VALUES (n.COD_IBGE, n.PALAVRA_CHAVE, n.FONTE, n.DAT_REFERENCIA, n.QTD)
+        """, linhas, batcherrors=True)
+        # Outra gravação simultânea pode ter inserido a mesma chave entre o MERGE e o INSERT
+        concorrentes = []
+        for erro in cur.getbatcherrors():
+            if erro.code != 1:
+                raise oracledb.DatabaseError(erro)
+            codigo, palavra, fonte, dia, qtd = linhas[erro.offset]
+            concorrentes.append((qtd, codigo, palavra, fonte, dia))
+        if concorrentes:
+            cur.executemany("""
+                UPDATE RESUMO_MUNICIPIOS SET QTD_NOTICIAS = QTD_NOTICIAS + :1, DAT_ATUALIZACAO = CURRENT_TIMESTAMP
+                WHERE COD_IBGE = :2 AND PALAVRA_CHAVE = :3 AND FONTE = :4 AND DAT_REFERENCIA = :5
+            """, concorrentes)
+    return len(mencoes) - len(repetidas)
+
+def _filtros(campos):
+    """Monta a cláusula WHERE e os binds a partir de pares (expressão SQL, valor), ignorando valores None."""
+    condicoes, binds = [], {}
+    for i, (expressao, valor) in enumerate(campos):
+        if valor is not None:
+            nome = f"f{i}"
+            condicoes.append(f"{expressao} :{nome}")
+            binds[nome] = valor
+    return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", binds
+
+def consultar_resumo(conn, cod_ibge=None, palavra_chave=None, fonte=None, inicio=None, fim=None, periodo='semana'):
+    """
+    Quantidade de notícias por município, palavra-chave, fonte e período, lida do RESUMO_MUNICIPIOS.
+
+    Args:
+        periodo: 'dia', 'semana' (iniciando na segunda-feira), 'mes' ou 'ano'.
+        inicio, fim: datas (date/datetime) inclusivas.
+
+    Returns:
+        list[dict]: cod_ibge, palavra_chave, fonte, periodo e qtd_noticias, em ordem de período.
+    """
+    if periodo not in PERIODOS:
+        raise ValueError(f"Período inválido: {periodo}. Use um de: {', '.join(PERIODOS)}.")
+    where, binds = _filtros([
+        ("COD_IBGE =", cod_ibge),
+        ("PALAVRA_CHAVE =", palavra_chave),
+        ("FONTE =", fonte),
+        ("DAT_REFERENCIA >=", inicio),
+        ("DAT_REFERENCIA <=", fim),
+    ])
+    trunc = f"TRUNC(DAT_REFERENCIA, '{PERIODOS[periodo]}')"
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            SELECT COD_IBGE, PALAVRA_CHAVE, FONTE, {trunc} AS PERIODO, SUM(QTD_NOTICIAS)
+            FROM RESUMO_MUNICIPIOS{where}
+            GROUP BY COD_IBGE, PALAVRA_CHAVE, FONTE, {trunc}
+            ORDER BY PERIODO, COD_IBGE, PALAVRA_CHAVE, FONTE
+        """, binds)
+        return [
+            {'cod_ibge': c, 'palavra_chave': p, 'fonte': f, 'periodo': d, 'qtd_noticias': int(q)}
+            for c, p, f, d, q in cur.fetchall()
+        ]
+    finally:
+        cur.close()
+
+def consultar_ranking(conn, palavra_chave=None, inicio=None, fim=None, limite=20):
+    """Municípios com mais notícias no intervalo (opcionalmente de uma palavra-chave)."""
+    where, binds = _filtros([
+        ("PALAVRA_CHAVE =", palavra_chave),
+        ("DAT_REFERENCIA >=", inicio),
+        ("DAT_REFERENCIA <=", fim),
+    ])
+    binds['limite'] = limite
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            SELECT COD_IBGE, SUM(QTD_NOTICIAS) AS QTD
+            FROM RESUMO_MUNICIPIOS{where}
+            GROUP BY COD_IBGE
+            ORDER BY QTD DESC
+            FETCH FIRST :limite ROWS ONLY
+        """, binds)
+        return [{'cod_ibge': c, 'qtd_noticias': int(q)} for c, q in cur.fetchall()]
+    finally:
+        cur.close()
+
+def consultar_noticias_municipio(conn, cod_ibge, palavra_chave=None, inicio=None, fim=None, limite=100):
+    """Notícias que citam o município (via MENCOES_MUNICIPIOS), das mais recentes para as mais antigas."""
+    where, binds = _filtros([
+        ("m.COD_IBGE =", cod_ibge),
+        ("m.PALAVRA_CHAVE =", palavra_chave),
+        ("m.DAT_REFERENCIA >=", inicio),
+        ("m.DAT_REFERENCIA <=", fim),
+    ])
+    binds['limite'] = limite
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            SELECT m.DAT_REFERENCIA, m.PALAVRA_CHAVE, m.FONTE, n.TITULO, n.LINK
+            FROM MENCOES_MUNICIPIOS m
+            JOIN NOTICIAS_MUNICIPIOS n ON n.IDE_NOTICIA = m.IDE_NOTICIA{where}
+            ORDER BY m.DAT_REFERENCIA DESC
+            FETCH FIRST :limite ROWS ONLY
+        """, binds)
+        return [
+            {'data': d, 'palavra_chave': p, 'fonte': f, 'titulo': t, 'link': l}
+            for d, p, f, t, l in cur.fetchall()
+        ]
+    finally:
+        cur.close()
+
+def reconstruir_resumo(conn):
+    """Recalcula o RESUMO_MUNICIPIOS a partir das menções (ex: após apagar execuções antigas)."""
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM RESUMO_MUNICIPIOS")
+        cur.execute("""
+            INSERT INTO RESUMO_MUNICIPIOS (COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA, QTD_NOTICIAS)
+            SELECT COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA, COUNT(*)
+            FROM MENCOES_MUNICIPIOS
+            GROUP BY COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA
+        """)
+        linhas = cur.rowcount
         conn.commit()
-        print(f"✅ {len(registros)} notícias persistidas no banco de dados com sucesso.")
+        logger.info("Resumo por município reconstruído: %s linhas.", linhas)
     except Exception as e:
-        print(f"Erro ao salvar notícias no banco: {e}")
+        logger.error("Erro ao reconstruir o resumo por município: %s", e)
         conn.rollback()
     finally:
         cur.close()
@@ -0,0 +1,208 @@
+"""
+Substituto local (SQLite) de auxiliar.db, com as mesmas funções usadas pela coleta.
+
+Serve para testes e testes de carga sem Oracle: as tabelas têm os mesmos nomes e
+colunas principais, e salvar_noticias também mantém as menções e o resumo por município.
+
+Exemplo:
+    import auxiliar.db_local as db_local
+    db_local.configurar('noticias_teste.db')
+    main.db = db_local
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+from collections import Counter
+
+from auxiliar.db import SEM_VALOR, _data_referencia, _hash_link
+
+logger = logging.getLogger(__name__)
+
+# Arquivo usado por abrirConexao e criar_pool (':memory:' só serve para abrirConexao: cada conexão teria o seu banco)
+caminho = 'noticias_local.db'
+
+
+def configurar(novo_caminho):
+    global caminho
+    caminho = novo_caminho
+
+
+def abrirConexao(db_user=None, db_password=None, db_encoding=None, db_host=None):
+    """Mesma assinatura de auxiliar.db.abrirConexao; as credenciais são ignoradas."""
+    logger.info("Conectando ao banco local: %s", caminho)
+    con = sqlite3.connect(caminho, timeout=60, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    criar_tabelas(con)
+    return con
+
+
+class PoolLocal:
+    """Pool de conexões SQLite com a mesma interface usada do pool do oracledb (acquire/release/close)."""
+
+    def __init__(self, caminho, maximo=4):
+        self.caminho = caminho
+        self._livres = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(maximo)
+
+    def acquire(self):
+        self._vagas.acquire()
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            con = sqlite3.connect(self.caminho, timeout=60, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            return con
+
+    def release(self, con):
+        self._livres.put(con)
+        self._vagas.release()
+
+    def close(self, force=False):
+        while True:
+            try:
+                self._livres.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def criar_pool(db_user=None, db_password=None, db_encoding=None, db_host=None, minimo=1, maximo=4):
+    """Mesma assinatura de auxiliar.db.criar_pool; as tabelas são criadas na primeira conexão."""
+    logger.info("Criando pool local (até %s conexões): %s", maximo, caminho)
+    pool = PoolLocal(caminho, maximo)
+    con = pool.acquire()
+    try:
+        criar_tabelas(con)
+    finally:
+        pool.release(con)
+    return pool
+
+
+def verificar_tabelas(conn):
+    # As tabelas são criadas ao abrir a conexão
+    pass
+
+
+def criar_tabelas(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS LOG_EXECUCAO_NOTICIAS (
+            IDE_EXECUCAO INTEGER PRIMARY KEY AUTOINCREMENT,
+            DES_PROCEDURE TEXT,
+            DES_ASSUNTO TEXT,
+            DAT_INICIO TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            DAT_FIM TIMESTAMP,
+            DES_ERRO TEXT,
+            STATUS TEXT DEFAULT 'EM ANDAMENTO'
+        );
+        CREATE TABLE IF NOT EXISTS NOTICIAS_MUNICIPIOS (
+            IDE_NOTICIA INTEGER PRIMARY KEY AUTOINCREMENT,
+            IDE_EXECUCAO INTEGER,
+            TITULO TEXT,
+            CONTEUDO TEXT,
+            FONTE TEXT,
+            DAT_PUBLICACAO TEXT,
+            LINK TEXT,
+            IMG_URL TEXT,
+            PALAVRA_CHAVE TEXT,
+            MUNICIPIOS_CITADOS TEXT,
+            DAT_CAPTURA TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS MENCOES_MUNICIPIOS (
+            HASH_LINK TEXT NOT NULL,
+            COD_IBGE TEXT NOT NULL,
+            PALAVRA_CHAVE TEXT NOT NULL,
+            FONTE TEXT NOT NULL,
+            DAT_REFERENCIA DATE NOT NULL,
+            IDE_NOTICIA INTEGER,
+            IDE_EXECUCAO INTEGER,
+            PRIMARY KEY (HASH_LINK, COD_IBGE, PALAVRA_CHAVE)
+        );
+        CREATE INDEX IF NOT EXISTS IDX_MENCOES_MUNICIPIO_DATA ON MENCOES_MUNICIPIOS (COD_IBGE, DAT_REFERENCIA);
+        CREATE TABLE IF NOT EXISTS RESUMO_MUNICIPIOS (
+            COD_IBGE TEXT NOT NULL,
+            PALAVRA_CHAVE TEXT NOT NULL,
+            FONTE TEXT NOT NULL,
+            DAT_REFERENCIA DATE NOT NULL,
+            QTD_NOTICIAS INTEGER NOT NULL DEFAULT 0,
+            DAT_ATUALIZACAO TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA)
+        );
+    """)
+    conn.commit()
+
+
+def registrar_inicio(conn, des_procedure, des_assunto):
+    cur = conn.execute(
+        "INSERT INTO LOG_EXECUCAO_NOTICIAS (DES_PROCEDURE, DES_ASSUNTO) VALUES (?, ?)", (des_procedure, des_assunto)
+    )
+    conn.commit()
+    return cur.lastrowid
+
+
+def registrar_fim(ide_execucao, conn):
+    if not ide_execucao: return
+    conn.execute("""
+        UPDATE LOG_EXECUCAO_NOTICIAS SET DAT_FIM = CURRENT_TIMESTAMP, STATUS = 'CONCLUIDO' WHERE IDE_EXECUCAO = ?
+    """, (ide_execucao,))
+    conn.commit()
+
+
+def registrar_erro(ide_execucao, erro_msg, conn):
+    if not ide_execucao: return
+    conn.execute("""
+        UPDATE LOG_EXECUCAO_NOTICIAS SET DAT_FIM = CURRENT_TIMESTAMP, STATUS = 'ERRO', DES_ERRO = ? WHERE IDE_EXECUCAO = ?
+    """, (str(erro_msg)[:4000], ide_execucao))
+    conn.commit()
+
+
+def salvar_noticias(conn, dados, ide_execucao):
+    """Mesmo contrato de auxiliar.db.salvar_noticias (dict de colunas ou DataFrame)."""
+    if dados is None:
+        return
+    if not isinstance(dados, dict):
+        dados = {coluna: dados[coluna].tolist() for coluna in dados.columns}
+
+    total = len(next(iter(dados.values()), []))
+    if total == 0:
+        return
+
+    def coluna(nome):
+        return [str(v) for v in (dados.get(nome) or [''] * total)]
+
+    fontes, datas, links, palavras = coluna('fonte'), coluna('datetime'), coluna('link'), coluna('palavra_chave')
+    try:
+        with conn:
+            cur = conn.cursor()
+            contagens = Counter()
+            for titulo, conteudo, fonte, data, link, img_url, palavra, municipios, codigo in zip(
+                coluna('titulo'), coluna('conteudo'), fontes, datas, links, coluna('img_url'), palavras,
+                coluna('municipios_citados'), coluna('codigo_municipio')
+            ):
+                cur.execute("""
+                    INSERT INTO NOTICIAS_MUNICIPIOS
+                    (IDE_EXECUCAO, TITULO, CONTEUDO, FONTE, DAT_PUBLICACAO, LINK, IMG_URL, PALAVRA_CHAVE, MUNICIPIOS_CITADOS)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (ide_execucao, titulo, conteudo, fonte, data, link, img_url, palavra, municipios))
+                codigo = codigo.strip()
+                if not codigo:
+                    continue
+                chave = (codigo, palavra or SEM_VALOR, fonte or SEM_VALOR, _data_referencia(data).isoformat())
+                cur.execute("""
+                    INSERT OR IGNORE INTO MENCOES_MUNICIPIOS
+                    (HASH_LINK, COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA, IDE_NOTICIA, IDE_EXECUCAO)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (_hash_link(link), *chave, cur.lastrowid, ide_execucao))
+                if cur.rowcount:
+                    contagens[chave] += 1
+            cur.executemany("""
+                INSERT INTO RESUMO_MUNICIPIOS (COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA, QTD_NOTICIAS)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (COD_IBGE, PALAVRA_CHAVE, FONTE, DAT_REFERENCIA)
+                DO UPDATE SET QTD_NOTICIAS = QTD_NOTICIAS + excluded.QTD_NOTICIAS, DAT_ATUALIZACAO = CURRENT_TIMESTAMP
+            """, [(*chave, qtd) for chave, qtd in contagens.items()])
+        logger.info("✅ %s notícias persistidas no banco local com sucesso (%s menções novas).",
+                    total, sum(contagens.values()))
+    except Exception as e:
+        logger.error("Erro ao salvar notícias no banco local: %s", e)
+        raise
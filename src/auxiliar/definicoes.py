@@ -86,12 +86,14 @@ def should_ignore_municipality(name, text):
         return not is_geographical_context(name, text)
     return False
 
-def get_municipios_from_title(title, text_content):
+def get_municipios_from_title(title, text_content, incluir_conteudo=False):
     """
     Extrai e filtra municípios usando o modelo do spacy e o contexto.
     Aplica pre-processamento no texto antes de extrair e filtrar.
     Aplica pós-processamento para tratar municípios com mais de uma palavra.
     Prioriza o contexto ao máximo.
+    Com incluir_conteudo=True (texto completo do artigo), os municípios também são
+    extraídos do conteúdo, e não apenas do título.
     """
     if not title and not text_content:
         return []
@@ -100,7 +102,10 @@ def get_municipios_from_title(title, text_content):
     processed_text_content = pre_process_text_for_municipality_detection(text_content)
     context_text = processed_text_content if processed_text_content and processed_text_content.strip() else processed_title
 
-    potential_municipios_raw = extrair_municipios(processed_title)
+    texto_extracao = processed_title
+    if incluir_conteudo and processed_text_content:
+        texto_extracao = f"{processed_title}\n{processed_text_content}"
+    potential_municipios_raw = extrair_municipios(texto_extracao)
     potential_normalized_set = {normalize_text(name) for name in potential_municipios_raw if isinstance(name, str)}
     filtered_municipios_normalized = set()
 
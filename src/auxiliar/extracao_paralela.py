@@ -0,0 +1,132 @@
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import auxiliar.definicoes as definicoes
+from auxiliar.logs import configurar_logs_processo, fila_logs_processos
+from auxiliar.registros import Noticia
+from auxiliar import cache_municipios
+
+logger = logging.getLogger(__name__)
+
+
+def _inicializar_worker(fila_logs, nivel_log):
+    # Com spawn (Windows/macOS) cada worker importa este módulo e carrega o modelo
+    # uma única vez aqui; com forkserver o modelo já está em memória.
+    import auxiliar.definicoes  # noqa: F401
+    configurar_logs_processo(fila_logs, nivel_log)
+
+
+def _extrair(par):
+    # None indica falha (ex: texto acima do max_length do spaCy): o item fica sem
+    # municípios nesta execução, mas não é gravado no cache como "nenhum município"
+    try:
+        return definicoes.get_municipios_from_title(*par)
+    except Exception as e:
+        logger.warning("Falha na extração de municípios de '%s': %s", str(par[0])[:80], e)
+        return None
+
+
+def _contexto_multiprocessing():
+    if sys.platform.startswith('linux'):
+        # fork a partir deste processo não é seguro: já há threads rodando (logs, gravação no
+        # banco, drivers) e um lock herdado no meio do uso trava o filho. O forkserver é um
+        # processo novo, sem threads, que importa definicoes (modelo spaCy e gazetteer) uma
+        # vez e cria os workers por fork a partir dele; as páginas de memória do modelo
+        # continuam compartilhadas entre os workers (copy-on-write).
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload(['auxiliar.definicoes'])
+        return ctx
+    return multiprocessing.get_context('spawn')
+
+
+def extrair_municipios_em_lote(pares, processos=None, tamanho_lote=64):
+    """
+    Extrai os municípios de vários (título, conteúdo) usando um pool de processos.
+
+    Args:
+        pares (list): Lista de tuplas (titulo, conteudo) ou (titulo, conteudo, incluir_conteudo).
+        processos (int): Quantidade de processos. None usa todos os núcleos.
+        tamanho_lote (int): Quantidade de itens enviada a cada worker por vez.
+
+    Returns:
+        list: Lista de listas de municípios ("Nome-Código"), na mesma ordem da entrada.
+    """
+    pares = list(pares)
+    if not pares:
+        return []
+
+    processos = processos or os.cpu_count() or 1
+    inicio = time.monotonic()
+
+    # Consulta o cache no processo pai; só textos inéditos (sem repetição) vão para o pool
+    cache = cache_municipios.obter()
+    chaves = [cache.chave(*par) for par in pares]
+    resultados = [cache.buscar(chave) for chave in chaves]
+    faltantes = {}
+    for chave, par, resultado in zip(chaves, pares, resultados):
+        if resultado is None and chave not in faltantes:
+            faltantes[chave] = par
+
+    pendentes = list(faltantes.values())
+    # Poucos itens ou um único processo: não compensa o custo de criar o pool
+    if processos <= 1 or len(pendentes) <= tamanho_lote:
+        novos = [_extrair(par) for par in pendentes]
+    else:
+        ctx = _contexto_multiprocessing()
+        with fila_logs_processos(ctx) as fila_logs:
+            with ctx.Pool(processes=processos, initializer=_inicializar_worker,
+                          initargs=(fila_logs, logging.getLogger().level)) as pool:
+                novos = pool.map(_extrair, pendentes, chunksize=tamanho_lote)
+
+    calculados = dict(zip(faltantes.keys(), novos))
+    falhas = 0
+    for chave, resultado in calculados.items():
+        if resultado is None:
+            falhas += 1
+        else:
+            cache.gravar(chave, resultado)
+    resultados = [resultado if resultado is not None else calculados[chave] or []
+                  for chave, resultado in zip(chaves, resultados)]
+
+    logger.info("Extração de municípios: %s itens (%s extraídos, %s falhas) em %.1fs (%s processos).",
+                len(pares), len(pendentes), falhas, time.monotonic() - inicio, processos)
+    return resultados
+
+
+def aplicar_municipios(news, processos=None, tamanho_lote=64, links_conteudo_completo=()):
+    """
+    Preenche 'municipios_citados' de cada notícia (Noticia) com a extração em lote.
+    A lista `news` é alterada no próprio objeto.
+
+    Notícias cujo link está em `links_conteudo_completo` (texto do artigo baixado)
+    também têm os municípios extraídos do conteúdo.
+    """
+    pares = [(noticia.titulo, noticia.conteudo, noticia.link in links_conteudo_completo) for noticia in news]
+    resultados = extrair_municipios_em_lote(pares, processos=processos, tamanho_lote=tamanho_lote)
+    for noticia, municipios in zip(news, resultados):
+        noticia.municipios_citados = ",".join(municipios) if municipios else ""
+    return news
+
+
+def reprocessar_planilha(caminho, processos=None, tamanho_lote=64):
+    """
+    Reprocessa uma exportação anterior (saida_*.xlsx) refazendo a identificação de municípios.
+
+    A planilha exportada tem uma linha por município; as notícias são reagrupadas
+    pelo link antes da nova extração.
+
+    Returns:
+        list: Lista de notícias (Noticia) com 'municipios_citados' recalculado.
+    """
+    import pandas as pd
+
+    df = pd.read_excel(caminho)
+    df = df.drop(columns=['codigo_municipio'], errors='ignore')
+    df = df.drop_duplicates(subset=['link'], keep='first')
+    df = df.fillna('')
+    news = [Noticia.de_dict(dados) for dados in df.to_dict(orient='records')]
+    logger.info("Reprocessando %s notícias de '%s'.", len(news), caminho)
+    return aplicar_municipios(news, processos=processos, tamanho_lote=tamanho_lote)
@@ -0,0 +1,346 @@
+import abc
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from auxiliar.armazenamento import ConexoesSQLite
+
+logger = logging.getLogger(__name__)
+
+
+class FilaTarefas(abc.ABC):
+    """
+    Interface da fila compartilhada de tarefas (fonte, termo) entre coordenador e workers.
+
+    Backends alternativos (ex: Redis, Oracle) devem implementar estes métodos e ser
+    registrados em BACKENDS para serem abertos por `abrir_fila`. Um backend que não
+    implemente todos os métodos falha ao ser instanciado.
+    """
+
+    @abc.abstractmethod
+    def nova_execucao(self, ide_banco=None, extrair_municipios=True):
+        """Cria uma execução e retorna seu identificador na fila."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def enfileirar(self, execucao, tarefas):
+        """Enfileira uma lista de (fonte, termo) para a execução."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def reservar(self, worker, lease):
+        """Reserva a próxima tarefa disponível por `lease` segundos. Retorna dict ou None."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def renovar(self, tarefa_id, worker, lease):
+        """Estende o lease de uma tarefa em andamento. Retorna False se o lease foi perdido."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def concluir(self, tarefa_id, worker, itens):
+        """Grava os resultados (idempotente, deduplicado por link) e conclui a tarefa."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def falhar(self, tarefa_id, worker, erro):
+        """Devolve a tarefa para a fila ou marca como erro após o limite de tentativas."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def em_aberto(self, execucao=None):
+        """Quantidade de tarefas pendentes ou em andamento."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def resumo(self, execucao):
+        """Quantidade de tarefas por status da execução."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def resultados(self, execucao):
+        """Notícias (dicts) da execução, deduplicadas por link, na ordem de chegada."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def execucao(self, execucao):
+        """Dados da execução (ide_banco, extrair_municipios)."""
+        raise NotImplementedError
+
+
+class FilaSQLite(FilaTarefas):
+    """
+    Fila de tarefas em um arquivo SQLite.
+
+    Vários processos (ou máquinas com o arquivo em disco compartilhado) podem usar a
+    mesma fila; as reservas usam transações BEGIN IMMEDIATE para não haver disputa.
+    """
+
+    def __init__(self, caminho, max_tentativas=3):
+        self.caminho = caminho
+        self.max_tentativas = max_tentativas
+        self._conexoes = ConexoesSQLite(caminho, row_factory=sqlite3.Row)
+        self._criar_tabelas()
+
+    def _criar_tabelas(self):
+        con = self._conexoes.obter()
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS EXECUCOES (
+                EXECUCAO INTEGER PRIMARY KEY AUTOINCREMENT,
+                IDE_BANCO INTEGER,
+                EXTRAIR_MUNICIPIOS INTEGER DEFAULT 1,
+                DAT_INICIO REAL
+            );
+            CREATE TABLE IF NOT EXISTS TAREFAS (
+                TAREFA_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                EXECUCAO INTEGER NOT NULL,
+                FONTE TEXT NOT NULL,
+                TERMO TEXT NOT NULL,
+                STATUS TEXT NOT NULL DEFAULT 'PENDENTE',
+                TENTATIVAS INTEGER NOT NULL DEFAULT 0,
+                WORKER TEXT,
+                LEASE_ATE REAL,
+                DES_ERRO TEXT,
+                UNIQUE (EXECUCAO, FONTE, TERMO)
+            );
+            CREATE INDEX IF NOT EXISTS IDX_TAREFAS_STATUS ON TAREFAS (STATUS, LEASE_ATE);
+            CREATE TABLE IF NOT EXISTS RESULTADOS (
+                EXECUCAO INTEGER NOT NULL,
+                LINK TEXT NOT NULL,
+                TAREFA_ID INTEGER,
+                DADOS TEXT NOT NULL,
+                PRIMARY KEY (EXECUCAO, LINK)
+            );
+        """)
+
+    def nova_execucao(self, ide_banco=None, extrair_municipios=True):
+        cur = self._conexoes.obter().execute(
+            "INSERT INTO EXECUCOES (IDE_BANCO, EXTRAIR_MUNICIPIOS, DAT_INICIO) VALUES (?, ?, ?)",
+            (ide_banco, 1 if extrair_municipios else 0, time.time())
+        )
+        return cur.lastrowid
+
+    def enfileirar(self, execucao, tarefas):
+        con = self._conexoes.obter()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.executemany(
+                "INSERT OR IGNORE INTO TAREFAS (EXECUCAO, FONTE, TERMO) VALUES (?, ?, ?)",
+                [(execucao, fonte, termo) for fonte, termo in tarefas]
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        logger.info("%s tarefas enfileiradas na execução %s.", len(tarefas), execucao)
+
+    def reservar(self, worker, lease):
+        con = self._conexoes.obter()
+        agora = time.time()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            # Leases vencidos que já esgotaram as tentativas não voltam para a fila
+            con.execute("""
+                UPDATE TAREFAS SET STATUS = 'ERRO', DES_ERRO = 'Lease expirado após o limite de tentativas'
+                WHERE STATUS = 'EM_ANDAMENTO' AND LEASE_ATE < ? AND TENTATIVAS >= ?
+            """, (agora, self.max_tentativas))
+            row = con.execute("""
+                SELECT T.TAREFA_ID, T.EXECUCAO, T.FONTE, T.TERMO, T.TENTATIVAS, E.EXTRAIR_MUNICIPIOS
+                FROM TAREFAS T JOIN EXECUCOES E ON E.EXECUCAO = T.EXECUCAO
+                WHERE T.STATUS = 'PENDENTE' OR (T.STATUS = 'EM_ANDAMENTO' AND T.LEASE_ATE < ?)
+                ORDER BY T.TAREFA_ID
+                LIMIT 1
+            """, (agora,)).fetchone()
+            if row is None:
+                con.execute("COMMIT")
+                return None
+            con.execute("""
+                UPDATE TAREFAS SET STATUS = 'EM_ANDAMENTO', WORKER = ?, LEASE_ATE = ?, TENTATIVAS = TENTATIVAS + 1
+                WHERE TAREFA_ID = ?
+            """, (worker, agora + lease, row['TAREFA_ID']))
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return {
+            'tarefa_id': row['TAREFA_ID'],
+            'execucao': row['EXECUCAO'],
+            'fonte': row['FONTE'],
+            'termo': row['TERMO'],
+            'tentativa': row['TENTATIVAS'] + 1,
+            'extrair_municipios': bool(row['EXTRAIR_MUNICIPIOS']),
+        }
+
+    def renovar(self, tarefa_id, worker, lease):
+        cur = self._conexoes.obter().execute("""
+            UPDATE TAREFAS SET LEASE_ATE = ?
+            WHERE TAREFA_ID = ? AND WORKER = ? AND STATUS = 'EM_ANDAMENTO'
+        """, (time.time() + lease, tarefa_id, worker))
+        return cur.rowcount == 1
+
+    def concluir(self, tarefa_id, worker, itens):
+        con = self._conexoes.obter()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            row = con.execute("SELECT EXECUCAO, STATUS FROM TAREFAS WHERE TAREFA_ID = ?", (tarefa_id,)).fetchone()
+            if row is None or row['STATUS'] == 'CONCLUIDA':
+                # Reenvio (ex: lease expirou e outro worker concluiu antes): nada a fazer
+                con.execute("COMMIT")
+                return False
+            con.executemany(
+                "INSERT OR IGNORE INTO RESULTADOS (EXECUCAO, LINK, TAREFA_ID, DADOS) VALUES (?, ?, ?, ?)",
+                [(row['EXECUCAO'], item['link'], tarefa_id, json.dumps(item, ensure_ascii=False, default=str))
+                 for item in itens if item.get('link')]
+            )
+            con.execute("""
+                UPDATE TAREFAS SET STATUS = 'CONCLUIDA', WORKER = ?, LEASE_ATE = NULL, DES_ERRO = NULL
+                WHERE TAREFA_ID = ?
+            """, (worker, tarefa_id))
+            con.execute("COMMIT")
+            return True
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+
+    def falhar(self, tarefa_id, worker, erro):
+        self._conexoes.obter().execute("""
+            UPDATE TAREFAS
+            SET STATUS = CASE WHEN TENTATIVAS >= ? THEN 'ERRO' ELSE 'PENDENTE' END,
+                LEASE_ATE = NULL, DES_ERRO = ?
+            WHERE TAREFA_ID = ? AND WORKER = ? AND STATUS = 'EM_ANDAMENTO'
+        """, (self.max_tentativas, str(erro)[:4000], tarefa_id, worker))
+
+    def em_aberto(self, execucao=None):
+        sql = "SELECT COUNT(*) FROM TAREFAS WHERE STATUS IN ('PENDENTE', 'EM_ANDAMENTO')"
+        params = ()
+        if execucao is not None:
+            sql += " AND EXECUCAO = ?"
+            params = (execucao,)
+        return self._conexoes.obter().execute(sql, params).fetchone()[0]
+
+    def resumo(self, execucao):
+        rows = self._conexoes.obter().execute(
+            "SELECT STATUS, COUNT(*) FROM TAREFAS WHERE EXECUCAO = ? GROUP BY STATUS", (execucao,)
+        ).fetchall()
+        return {status: qtd for status, qtd in rows}
+
+    def resultados(self, execucao):
+        rows = self._conexoes.obter().execute(
+            "SELECT DADOS FROM RESULTADOS WHERE EXECUCAO = ? ORDER BY ROWID", (execucao,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def execucao(self, execucao):
+        row = self._conexoes.obter().execute(
+            "SELECT IDE_BANCO, EXTRAIR_MUNICIPIOS FROM EXECUCOES WHERE EXECUCAO = ?", (execucao,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'ide_banco': row['IDE_BANCO'], 'extrair_municipios': bool(row['EXTRAIR_MUNICIPIOS'])}
+
+
+# Backends disponíveis por esquema de URL (ex: "sqlite:///fila.db")
+BACKENDS = {
+    'sqlite': FilaSQLite,
+}
+
+
+def abrir_fila(url, **kwargs):
+    """
+    Abre a fila a partir de uma URL ("esquema:///caminho") ou de um caminho de arquivo SQLite.
+    """
+    if '://' in url:
+        esquema, caminho = url.split('://', 1)
+        if esquema == 'sqlite' and caminho.startswith('/'):
+            # Mesma convenção do SQLAlchemy: sqlite:///relativo.db e sqlite:////absoluto.db
+            caminho = caminho[1:]
+    else:
+        esquema, caminho = 'sqlite', url
+    backend = BACKENDS.get(esquema)
+    if backend is None:
+        raise ValueError(f"Backend de fila '{esquema}' não suportado. Opções: {', '.join(BACKENDS)}")
+    return backend(caminho, **kwargs)
+
+
+def identificador_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def processar_tarefas(fila, executar_tarefa, lease=600, aguardar=False, intervalo=5):
+    """
+    Laço do worker: reserva tarefas da fila, executa e envia os resultados.
+
+    Args:
+        fila (FilaTarefas): Fila compartilhada.
+        executar_tarefa (callable): Recebe o dict da tarefa e retorna a lista de notícias.
+        lease (int): Duração do lease em segundos; é renovado em segundo plano durante a tarefa.
+        aguardar (bool): Se True, continua esperando novas tarefas quando a fila esvazia.
+        intervalo (int): Intervalo em segundos entre consultas quando não há tarefa disponível.
+
+    Returns:
+        int: Quantidade de tarefas concluídas por este worker.
+    """
+    worker = identificador_worker()
+    concluidas = 0
+    logger.info("Worker %s iniciado.", worker)
+
+    while True:
+        tarefa = fila.reservar(worker, lease)
+        if tarefa is None:
+            # Tarefas em andamento em outros workers podem voltar para a fila se o lease vencer
+            if aguardar or fila.em_aberto() > 0:
+                time.sleep(intervalo)
+                continue
+            break
+
+        parar = threading.Event()
+
+        def renovar_lease():
+            while not parar.wait(lease / 3):
+                if not fila.renovar(tarefa['tarefa_id'], worker, lease):
+                    logger.warning("Lease da tarefa %s perdido.", tarefa['tarefa_id'])
+                    return
+
+        renovador = threading.Thread(target=renovar_lease, daemon=True)
+        renovador.start()
+        try:
+            itens = executar_tarefa(tarefa)
+            parar.set()
+            if fila.concluir(tarefa['tarefa_id'], worker, itens):
+                concluidas += 1
+            logger.info("Tarefa %s (%s em %s) concluída com %s notícias.",
+                        tarefa['tarefa_id'], tarefa['termo'], tarefa['fonte'], len(itens))
+        except Exception as e:
+            parar.set()
+            logger.error("Tarefa %s (%s em %s) falhou na tentativa %s: %s",
+                         tarefa['tarefa_id'], tarefa['termo'], tarefa['fonte'], tarefa['tentativa'], e)
+            fila.falhar(tarefa['tarefa_id'], worker, e)
+        finally:
+            renovador.join(1)
+
+    logger.info("Worker %s encerrado: %s tarefas concluídas.", worker, concluidas)
+    return concluidas
+
+
+def aguardar_execucao(fila, execucao, intervalo=5, processos=()):
+    """
+    Aguarda até que todas as tarefas da execução sejam concluídas ou falhem.
+    `processos` são workers locais (subprocess.Popen) apenas acompanhados para log.
+    """
+    ultimo = None
+    while fila.em_aberto(execucao) > 0:
+        resumo = fila.resumo(execucao)
+        if resumo != ultimo:
+            logger.info("Execução %s: %s", execucao, resumo)
+            ultimo = resumo
+        if processos and all(p.poll() is not None for p in processos):
+            logger.warning("Todos os workers locais encerraram com tarefas em aberto; aguardando workers externos.")
+            processos = ()
+        time.sleep(intervalo)
+    resumo = fila.resumo(execucao)
+    logger.info("Execução %s finalizada: %s", execucao, resumo)
+    return resumo
@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Sinaliza o fim da fila para as threads de gravação
+_FIM = object()
+
+
+class GravadorBanco:
+    """
+    Persistência em segundo plano sobre um pool de conexões.
+
+    `salvar_noticias` apenas enfileira o lote e retorna; threads de gravação obtêm uma
+    conexão do pool, gravam e devolvem a conexão. A fila é limitada (`max_pendentes`):
+    com ela cheia, quem enfileira aguarda (contrapressão), e a memória não cresce se o
+    banco ficar mais lento que a coleta.
+
+    `registrar_fim`/`registrar_erro` aguardam os lotes pendentes antes de gravar o status,
+    e `encerrar` grava o que restou na fila antes de fechar o pool. Lotes que falharam
+    são contados em `estatisticas`; com algum lote perdido, `registrar_fim` grava a
+    execução como ERRO (com a quantidade e o último erro) em vez de CONCLUIDO.
+
+    O `backend` é o módulo com as funções de persistência (auxiliar.db ou, em testes,
+    auxiliar.db_local) e o `pool` deve oferecer acquire/release/close.
+    """
+
+    def __init__(self, pool, backend, threads=1, max_pendentes=8):
+        self.pool = pool
+        self.backend = backend
+        self._fila = queue.Queue(maxsize=max_pendentes)
+        self._lock = threading.Lock()
+        self._encerrado = False
+        self.estatisticas = {'lotes': 0, 'linhas': 0, 'falhas': 0, 'linhas_perdidas': 0, 'tempo_gravacao': 0.0,
+                             'tempo_espera': 0.0}
+        self.ultimo_erro = None
+        self._threads = [
+            threading.Thread(target=self._gravar, name=f"gravador-banco-{i}", daemon=True)
+            for i in range(max(threads, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @contextmanager
+    def conexao(self):
+        con = self.pool.acquire()
+        try:
+            yield con
+        finally:
+            self.pool.release(con)
+
+    def executar(self, funcao, *args):
+        """Executa `funcao(con, *args)` de forma síncrona com uma conexão do pool."""
+        with self.conexao() as con:
+            return funcao(con, *args)
+
+    def _gravar(self):
+        while True:
+            item = self._fila.get()
+            try:
+                if item is _FIM:
+                    return
+                dados, ide_execucao, linhas = item
+                inicio = time.monotonic()
+                try:
+                    with self.conexao() as con:
+                        self.backend.salvar_noticias(con, dados, ide_execucao)
+                    perdidas = 0
+                except Exception as e:
+                    logger.error("Erro na gravação em segundo plano (%s linhas perdidas): %s", linhas, e)
+                    perdidas = linhas
+                    with self._lock:
+                        self.ultimo_erro = e
+                with self._lock:
+                    self.estatisticas['lotes'] += 1
+                    self.estatisticas['falhas'] += 1 if perdidas else 0
+                    self.estatisticas['linhas'] += linhas - perdidas
+                    self.estatisticas['linhas_perdidas'] += perdidas
+                    self.estatisticas['tempo_gravacao'] += time.monotonic() - inicio
+            finally:
+                self._fila.task_done()
+
+    def salvar_noticias(self, dados, ide_execucao):
+        """Enfileira um lote (dict de colunas ou DataFrame). Aguarda se a fila estiver cheia."""
+        if self._encerrado:
+            raise RuntimeError("Gravador encerrado.")
+        linhas = len(next(iter(dados.values()), [])) if isinstance(dados, dict) else len(dados)
+        if not linhas:
+            return
+        inicio = time.monotonic()
+        self._fila.put((dados, ide_execucao, linhas))
+        espera = time.monotonic() - inicio
+        if espera > 1:
+            logger.debug("Coleta aguardou %.1fs pela fila de gravação.", espera)
+        with self._lock:
+            self.estatisticas['tempo_espera'] += espera
+
+    def aguardar(self):
+        """Bloqueia até que todos os lotes enfileirados tenham sido gravados."""
+        self._fila.join()
+
+    def registrar_inicio(self, des_procedure, des_assunto):
+        return self.executar(self.backend.registrar_inicio, des_procedure, des_assunto)
+
+    def _descrever_falhas(self):
+        e = self.estatisticas
+        if not e['falhas']:
+            return None
+        return (f"{e['falhas']} lotes não gravados no banco ({e['linhas_perdidas']} linhas); "
+                f"último erro: {self.ultimo_erro}")
+
+    def registrar_fim(self, ide_execucao):
+        """
+        Aguarda os lotes pendentes e grava o fim da execução. Retorna False (e grava a
+        execução como ERRO) se algum lote não pôde ser gravado.
+        """
+        self.aguardar()
+        falhas = self._descrever_falhas()
+        with self.conexao() as con:
+            if falhas:
+                logger.error("Execução %s finalizada com perdas: %s", ide_execucao, falhas)
+                self.backend.registrar_erro(ide_execucao, falhas, con)
+                return False
+            self.backend.registrar_fim(ide_execucao, con)
+        return True
+
+    def registrar_erro(self, ide_execucao, erro_msg):
+        self.aguardar()
+        falhas = self._descrever_falhas()
+        with self.conexao() as con:
+            self.backend.registrar_erro(ide_execucao, f"{erro_msg} | {falhas}" if falhas else erro_msg, con)
+
+    def resumo(self):
+        e = self.estatisticas
+        return (f"{e['lotes']} lotes, {e['linhas']} linhas, {e['falhas']} falhas "
+                f"({e['linhas_perdidas']} linhas perdidas), "
+                f"{e['tempo_gravacao']:.1f}s gravando, {e['tempo_espera']:.1f}s de espera da coleta")
+
+    def encerrar(self):
+        """Grava os lotes pendentes, finaliza as threads e fecha o pool."""
+        if self._encerrado:
+            return
+        self._encerrado = True
+        for _ in self._threads:
+            self._fila.put(_FIM)
+        for thread in self._threads:
+            thread.join()
+        logger.info("Gravação no banco: %s", self.resumo())
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.encerrar()
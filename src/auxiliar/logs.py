@@ -0,0 +1,147 @@
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+# Contexto da execução anexado a cada registro (fonte, termo e ide_execucao)
+_contexto = contextvars.ContextVar('contexto_log', default={})
+
+CAMPOS_CONTEXTO = ('fonte', 'termo', 'ide_execucao')
+
+_listener = None
+
+
+class FiltroContexto(logging.Filter):
+    """Copia o contexto atual (fonte, termo, ide_execucao) para os atributos do registro."""
+
+    def filter(self, record):
+        contexto = _contexto.get()
+        for campo in CAMPOS_CONTEXTO:
+            if not hasattr(record, campo):
+                setattr(record, campo, contexto.get(campo))
+        return True
+
+
+class FormatadorJSON(logging.Formatter):
+    """Formata cada registro como uma linha JSON para processamento automatizado."""
+
+    def format(self, record):
+        dados = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for campo in CAMPOS_CONTEXTO:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                dados[campo] = valor
+        if record.exc_info:
+            dados['exc'] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+@contextlib.contextmanager
+def contexto_log(**campos):
+    """Define campos de contexto (fonte, termo, ide_execucao) para os logs emitidos no bloco."""
+    token = _contexto.set({**_contexto.get(), **campos})
+    try:
+        yield
+    finally:
+        _contexto.reset(token)
+
+
+def definir_contexto(**campos):
+    """Define campos de contexto sem escopo (ex: ide_execucao para toda a execução)."""
+    _contexto.set({**_contexto.get(), **campos})
+
+
+def configurar_logs(nivel='INFO', formato_json=False, arquivo=None):
+    """
+    Configura o logging da aplicação com um handler não bloqueante baseado em fila.
+
+    Os registros são enfileirados pela thread que os emite e escritos em stdout
+    (ou em `arquivo`) por uma thread dedicada, tirando a E/S do caminho crítico.
+
+    Args:
+        nivel (str): Nível mínimo (DEBUG, INFO, WARNING, ERROR).
+        formato_json (bool): Se True, emite uma linha JSON por registro.
+        arquivo (str): Caminho de arquivo de log. Se None, usa stdout.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    if arquivo:
+        destino = logging.FileHandler(arquivo, encoding='utf-8')
+    else:
+        destino = logging.StreamHandler(sys.stdout)
+
+    if formato_json:
+        destino.setFormatter(FormatadorJSON())
+    else:
+        destino.setFormatter(logging.Formatter('%(message)s'))
+
+    fila = queue.SimpleQueue()
+    handler_fila = logging.handlers.QueueHandler(fila)
+    handler_fila.addFilter(FiltroContexto())
+
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(handler_fila)
+    raiz.setLevel(getattr(logging, str(nivel).upper(), logging.INFO))
+
+    # Bibliotecas ruidosas ficam em WARNING mesmo com a aplicação em DEBUG
+    for nome in ('selenium', 'urllib3', 'WDM'):
+        logging.getLogger(nome).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(fila, destino, respect_handler_level=True)
+    _listener.start()
+    atexit.register(encerrar_logs)
+
+
+class _Reemitir(logging.Handler):
+    """Reemite no processo atual os registros recebidos de processos filhos."""
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+@contextlib.contextmanager
+def fila_logs_processos(ctx):
+    """
+    Fila para os registros de um pool de processos (ver `configurar_logs_processo`).
+
+    Enquanto o bloco durar, uma thread lê a fila e reemite os registros nos handlers
+    do processo atual; ao sair, o que restou na fila é escrito antes de retornar.
+    """
+    fila = ctx.Queue()
+    ouvinte = logging.handlers.QueueListener(fila, _Reemitir())
+    ouvinte.start()
+    try:
+        yield fila
+    finally:
+        ouvinte.stop()
+        fila.close()
+
+
+def configurar_logs_processo(fila, nivel):
+    """No processo filho: envia todos os registros para a fila do processo pai."""
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    raiz.setLevel(nivel)
+
+
+def encerrar_logs():
+    """Esvazia a fila e encerra a thread de escrita dos logs."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,7 +1,13 @@
+import os
+
 import pandas as pd
 import functools
 
-df = pd.read_excel('src\\data\\municipios_metadata.xlsx', sheet_name='municipios_bahia')
+# Relativo a este arquivo, para funcionar com qualquer diretório de trabalho (raiz do repositório ou src/)
+CAMINHO_METADADOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 'data', 'municipios_metadata.xlsx')
+
+df = pd.read_excel(CAMINHO_METADADOS, sheet_name='municipios_bahia')
 
 codigos_municipios = df['Município'].tolist()
 municipios = df['Nome_Município'].tolist()
@@ -0,0 +1,271 @@
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+
+import psutil
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from auxiliar.proxies import ProxyBloqueado
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+
+class GerenciadorDrivers:
+    """
+    Mantém um driver do Chrome reaproveitado entre fontes e termos de busca.
+
+    - Recicla o driver após `max_paginas` páginas ou quando a memória (RSS) do
+      chromedriver e dos processos do Chrome ultrapassa `limite_memoria_mb`.
+    - Aplica timeouts de carregamento de página e de script em cada driver criado.
+    - Executa cada tarefa com prazo máximo (`prazo_tarefa`); se estourar, o navegador
+      travado é encerrado à força (chromedriver e todos os processos do Chrome) e
+      substituído por um novo.
+    - Opcionalmente usa um diretório de perfil persistente para reaproveitar o cache
+      de arquivos estáticos entre execuções. Cada processo reserva um perfil fixo
+      (`perfil_0`, `perfil_1`, ...) com um arquivo de trava, o mesmo em toda execução.
+    - Com um pool de proxies, cada driver recebe um proxy fixo ao ser criado; falhas de
+      rede e bloqueios são registrados no pool e, se o proxy for ejetado, o driver é
+      reciclado para usar outro.
+    """
+
+    def __init__(self, fabrica, max_paginas=50, limite_memoria_mb=None, timeout_pagina=30,
+                 timeout_script=30, prazo_tarefa=180, dir_perfil=None, pool_proxies=None):
+        """
+        Args:
+            fabrica (callable): Função que cria o driver. Recebe o argumento nomeado
+                                `dir_perfil` (str ou None).
+            max_paginas (int): Quantidade de páginas carregadas antes de reciclar o driver.
+            limite_memoria_mb (float): Limite de memória (RSS, em MB) do navegador antes de reciclar.
+                                       None desativa.
+            timeout_pagina (int): Timeout (s) de carregamento de página.
+            timeout_script (int): Timeout (s) de execução de scripts assíncronos.
+            prazo_tarefa (int): Prazo (s) de relógio para cada tarefa executada no driver.
+            dir_perfil (str): Diretório do perfil persistente do Chrome. None desativa.
+            pool_proxies (PoolProxies): Pool de proxies. A fabrica recebe também o
+                                        argumento nomeado `proxy` (URL).
+        """
+        self.fabrica = fabrica
+        self.max_paginas = max_paginas
+        self.limite_memoria_mb = limite_memoria_mb
+        self.timeout_pagina = timeout_pagina
+        self.timeout_script = timeout_script
+        self.prazo_tarefa = prazo_tarefa
+        self.dir_perfil = dir_perfil
+        self.pool_proxies = pool_proxies
+        self._perfil = None
+        self._trava_perfil = None
+        self.proxy = None
+        self.driver = None
+        self.paginas = 0
+        self.drivers_criados = 0
+        self.reciclagens = 0
+        self.tarefas_abortadas = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.encerrar()
+        return False
+
+    def _caminho_perfil(self):
+        if not self.dir_perfil:
+            return None
+        if self._perfil is None:
+            # O Chrome não permite dois processos no mesmo perfil: cada processo reserva o primeiro
+            # perfil livre e o mantém enquanto o gerenciador existir (o cache sobrevive à reciclagem)
+            base = os.path.abspath(self.dir_perfil)
+            os.makedirs(base, exist_ok=True)
+            for i in itertools.count():
+                caminho = os.path.join(base, f"perfil_{i}")
+                trava = open(caminho + ".lock", "a+")
+                if _travar(trava):
+                    break
+                trava.close()
+            os.makedirs(caminho, exist_ok=True)
+            self._perfil, self._trava_perfil = caminho, trava
+            logger.info("Usando perfil do Chrome: %s", caminho)
+        return self._perfil
+
+    def _liberar_perfil(self):
+        if self._trava_perfil is not None:
+            # Fechar o arquivo libera a trava (também liberada pelo sistema se o processo morrer)
+            self._trava_perfil.close()
+            self._perfil = self._trava_perfil = None
+
+    def _criar(self):
+        kwargs = {'dir_perfil': self._caminho_perfil()}
+        if self.pool_proxies is not None:
+            self.proxy = self.pool_proxies.escolher()
+            kwargs['proxy'] = self.proxy.url
+        driver = self.fabrica(**kwargs)
+        driver.set_page_load_timeout(self.timeout_pagina)
+        driver.set_script_timeout(self.timeout_script)
+        self.drivers_criados += 1
+        self.paginas = 0
+        logger.info("Novo driver criado (total de drivers nesta execução: %s)%s.", self.drivers_criados,
+                    f" via proxy {self.proxy.url}" if self.proxy else "")
+        return driver
+
+    def obter(self):
+        """Retorna o driver atual, criando um novo se necessário."""
+        if self.driver is None:
+            self.driver = self._criar()
+        return self.driver
+
+    def memoria_mb(self):
+        """Memória (RSS) do chromedriver e dos processos do Chrome em MB, ou None se não for possível medir."""
+        processos = _arvore_processos(self.driver)
+        total = 0
+        for processo in processos:
+            try:
+                total += processo.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024) if total else None
+
+    def _precisa_reciclar(self):
+        if self.max_paginas and self.paginas >= self.max_paginas:
+            return f"{self.paginas} páginas carregadas"
+        if self.limite_memoria_mb:
+            memoria = self.memoria_mb()
+            if memoria is not None and memoria > self.limite_memoria_mb:
+                return f"{memoria:.0f} MB de memória"
+        return None
+
+    def _finalizar(self, driver, prazo=10):
+        """
+        Encerra o driver; se o quit travar (ou deixar processos para trás), mata o chromedriver
+        e todos os processos do Chrome, para que nada fique órfão segurando memória ou o perfil.
+        """
+        if driver is None:
+            return
+        # A árvore é lida antes do quit: depois que o chromedriver morre, o Chrome deixa de ser seu filho
+        processos = _arvore_processos(driver)
+        t = threading.Thread(target=lambda: _quit_silencioso(driver), daemon=True)
+        t.start()
+        t.join(prazo)
+        if t.is_alive():
+            logger.warning("O driver não encerrou em %ss. Matando %s processos do navegador.", prazo, len(processos))
+        for processo in processos:
+            try:
+                processo.kill()
+            except psutil.Error:
+                pass
+        _, restantes = psutil.wait_procs(processos, timeout=5)
+        if restantes:
+            logger.warning("Processos do navegador que não encerraram: %s", [p.pid for p in restantes])
+
+    def reciclar(self, motivo=""):
+        """Descarta o driver atual; o próximo `obter` cria um novo."""
+        if self.driver is not None:
+            logger.info("Reciclando driver%s.", f" ({motivo})" if motivo else "")
+            self.reciclagens += 1
+            self._finalizar(self.driver)
+            self.driver = None
+
+    def executar(self, tarefa):
+        """
+        Executa `tarefa(driver)` respeitando o prazo de relógio configurado.
+
+        Cada chamada conta como uma página carregada. Se a tarefa estourar o prazo,
+        o navegador é encerrado à força, substituído na próxima chamada e uma
+        TimeoutException é levantada.
+        """
+        driver = self.obter()
+        resultado = {}
+
+        def alvo():
+            try:
+                resultado['valor'] = tarefa(driver)
+            except BaseException as e:
+                resultado['erro'] = e
+
+        inicio = time.monotonic()
+        # Propaga o contexto de log (fonte/termo) para a thread da tarefa
+        t = threading.Thread(target=contextvars.copy_context().run, args=(alvo,), daemon=True)
+        t.start()
+        t.join(self.prazo_tarefa)
+        self.paginas += 1
+
+        duracao = time.monotonic() - inicio
+        proxy = self.proxy
+
+        if t.is_alive():
+            self.tarefas_abortadas += 1
+            logger.warning("Tarefa excedeu o prazo de %ss. Encerrando navegador travado.", self.prazo_tarefa)
+            self.driver = None
+            self._finalizar(driver, prazo=5)
+            if self.pool_proxies is not None:
+                self.pool_proxies.registrar_falha(proxy, duracao)
+            raise TimeoutException(f"Tarefa excedeu o prazo de {self.prazo_tarefa}s ({duracao:.0f}s).")
+
+        erro = resultado.get('erro')
+        if self.pool_proxies is not None:
+            if isinstance(erro, ProxyBloqueado):
+                self.pool_proxies.registrar_falha(proxy, duracao, throttle=True)
+                self.reciclar(f"proxy {proxy.url} bloqueado")
+            elif _erro_de_rede(erro):
+                if self.pool_proxies.registrar_falha(proxy, duracao):
+                    self.reciclar(f"proxy {proxy.url} ejetado")
+            else:
+                self.pool_proxies.registrar_sucesso(proxy, duracao)
+
+        motivo = self._precisa_reciclar()
+        if motivo:
+            self.reciclar(motivo)
+
+        if 'erro' in resultado:
+            raise resultado['erro']
+        return resultado.get('valor')
+
+    def encerrar(self):
+        """Encerra o driver atual e exibe o resumo de uso."""
+        if self.driver is not None:
+            self._finalizar(self.driver)
+            self.driver = None
+        self._liberar_perfil()
+        logger.info("Drivers criados: %s | reciclagens: %s | tarefas abortadas por prazo: %s",
+                    self.drivers_criados, self.reciclagens, self.tarefas_abortadas)
+
+
+def _erro_de_rede(erro):
+    # Falhas de conexão do Chrome (ex: net::ERR_PROXY_CONNECTION_FAILED, net::ERR_TIMED_OUT)
+    return isinstance(erro, WebDriverException) and 'net::ERR_' in str(erro)
+
+
+def _travar(arquivo):
+    """Trava exclusiva e não bloqueante no arquivo; False se outro processo já a detém."""
+    try:
+        if os.name == 'nt':
+            arquivo.seek(0)
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _arvore_processos(driver):
+    """Processo do chromedriver e todos os seus descendentes (Chrome, renderers, GPU...)."""
+    try:
+        raiz = psutil.Process(driver.service.process.pid)
+        return [raiz] + raiz.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return []
+
+
+def _quit_silencioso(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
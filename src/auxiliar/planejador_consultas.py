@@ -0,0 +1,143 @@
+import logging
+import re
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Sufixo genérico dos termos de pesquisa; com o município na consulta ele só reduz o recall
+SUFIXO_REGIAO = re.compile(r'\s+bahia\s*$', re.IGNORECASE)
+
+
+def normalizar_topico(termo):
+    """Remove o sufixo ' Bahia' do termo, que passa a ser combinado com os municípios."""
+    return SUFIXO_REGIAO.sub('', termo.strip()).strip() or termo.strip()
+
+
+def montar_consulta(topico, municipios):
+    """Monta a consulta 'tópico ("Município A" OR "Município B" ...)'."""
+    if len(municipios) == 1:
+        return f'{topico} "{municipios[0]}"'
+    return f'{topico} (' + ' OR '.join(f'"{m}"' for m in municipios) + ')'
+
+
+def _cabe(topico, municipios, max_caracteres, max_palavras):
+    consulta = montar_consulta(topico, municipios)
+    if max_caracteres and len(consulta) > max_caracteres:
+        return False
+    if max_palavras and len(consulta.split()) > max_palavras:
+        return False
+    return True
+
+
+def agrupar_municipios(topico, municipios, max_caracteres=None, max_palavras=None):
+    """
+    Distribui os municípios no menor número de grupos OR que respeitem os limites da consulta.
+
+    Usa first-fit decreasing: nomes mais longos são alocados primeiro, cada um no
+    primeiro grupo em que ainda cabe.
+
+    Returns:
+        list: Lista de grupos (listas de nomes de municípios).
+    """
+    grupos = []
+    for municipio in sorted(municipios, key=lambda m: (-len(m.split()), -len(m), m)):
+        for grupo in grupos:
+            if _cabe(topico, grupo + [municipio], max_caracteres, max_palavras):
+                grupo.append(municipio)
+                break
+        else:
+            if not _cabe(topico, [municipio], max_caracteres, max_palavras):
+                logger.warning("Município '%s' não cabe na consulta de '%s' mesmo sozinho; consultando assim mesmo.",
+                               municipio, topico)
+            grupos.append([municipio])
+    return grupos
+
+
+class GrupoConsulta:
+    """Uma consulta planejada: um tópico combinado com um grupo de municípios."""
+
+    __slots__ = ('topico', 'municipios', 'nivel')
+
+    def __init__(self, topico, municipios, nivel=0):
+        self.topico = topico
+        self.municipios = list(municipios)
+        self.nivel = nivel
+
+    @property
+    def consulta(self):
+        return montar_consulta(self.topico, self.municipios)
+
+    def dividir(self):
+        meio = len(self.municipios) // 2
+        return (GrupoConsulta(self.topico, self.municipios[:meio], self.nivel + 1),
+                GrupoConsulta(self.topico, self.municipios[meio:], self.nivel + 1))
+
+    def __repr__(self):
+        return f"GrupoConsulta({self.topico!r}, {len(self.municipios)} municípios)"
+
+
+class PlanejadorConsultas:
+    """
+    Gera as buscas município × tópico empacotadas em consultas OR.
+
+    Um grupo cuja busca satura a página de resultados (`limite_saturacao` itens)
+    provavelmente perdeu notícias; ele é dividido ao meio e as metades voltam para
+    o início da fila. A atribuição das notícias aos municípios continua sendo feita
+    pela extração de municípios existente.
+
+    Fontes sem OR (`suporta_or=False`) são rejeitadas: cada município viraria uma busca
+    própria (417 × tópicos carregamentos de página), o custo que o plano existe para evitar.
+    """
+
+    def __init__(self, topicos, municipios, max_caracteres=None, max_palavras=None, suporta_or=True,
+                 limite_saturacao=90):
+        if not suporta_or:
+            raise ValueError("O planejamento por municípios exige uma fonte que aceite consultas OR.")
+        self.limite_saturacao = limite_saturacao
+        self.municipios = list(dict.fromkeys(municipios))
+        self.topicos = list(dict.fromkeys(normalizar_topico(t) for t in topicos if t and t.strip()))
+        self.pendentes = deque()
+        for topico in self.topicos:
+            grupos = agrupar_municipios(topico, self.municipios, max_caracteres, max_palavras)
+            self.pendentes.extend(GrupoConsulta(topico, grupo) for grupo in grupos)
+        self.planejadas = len(self.pendentes)
+        self.executadas = 0
+        self.divisoes = 0
+        logger.info("Plano de consultas: %s tópicos × %s municípios = %s combinações em %s consultas.",
+                    len(self.topicos), len(self.municipios), len(self.topicos) * len(self.municipios),
+                    self.planejadas)
+
+    @classmethod
+    def para_fonte(cls, topicos, municipios, config, **kwargs):
+        """Cria o planejador com os limites de consulta da configuração da fonte."""
+        return cls(
+            topicos, municipios,
+            max_caracteres=config.get('max_query_chars'),
+            max_palavras=config.get('max_query_words'),
+            suporta_or=config.get('query_or', False),
+            **kwargs
+        )
+
+    def __iter__(self):
+        while self.pendentes:
+            yield self.pendentes.popleft()
+
+    def registrar(self, grupo, total_itens):
+        """Registra o total de itens da página; divide o grupo se a busca saturou."""
+        self.executadas += 1
+        if total_itens >= self.limite_saturacao and len(grupo.municipios) > 1:
+            metade_a, metade_b = grupo.dividir()
+            self.pendentes.appendleft(metade_b)
+            self.pendentes.appendleft(metade_a)
+            self.divisoes += 1
+            logger.info("Consulta saturada (%s itens) para %r; dividindo em %s + %s municípios.",
+                        total_itens, grupo, len(metade_a.municipios), len(metade_b.municipios))
+
+    def resumo(self):
+        total = len(self.topicos) * len(self.municipios)
+        return {
+            'combinacoes': total,
+            'consultas_planejadas': self.planejadas,
+            'consultas_executadas': self.executadas,
+            'divisoes': self.divisoes,
+        }
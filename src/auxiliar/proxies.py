@@ -0,0 +1,217 @@
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Respostas atribuídas ao proxy: 429 é limitação de taxa na saída; 407/502 são falhas do próprio proxy.
+# Outros erros (ex: 403 de CDN de imagens) são do destino e não contam contra o proxy.
+STATUS_THROTTLE = {429}
+STATUS_FALHA_PROXY = {407, 502}
+
+URL_TESTE_PADRAO = 'https://www.google.com/generate_204'
+
+
+class ProxyBloqueado(Exception):
+    """A fonte bloqueou ou limitou a saída atual (ex: página /sorry/ do Google, HTTP 429)."""
+
+
+class Proxy:
+    """Estado e métricas de um endpoint de proxy do pool."""
+
+    __slots__ = ('url', 'falhas_seguidas', 'ejetado_ate', 'ejecoes', 'requisicoes', 'erros', 'throttles',
+                 'tempo_total', 'primeiro_uso', 'ultimo_uso')
+
+    def __init__(self, url):
+        self.url = url
+        self.falhas_seguidas = 0
+        self.ejetado_ate = 0.0
+        self.ejecoes = 0
+        self.requisicoes = 0
+        self.erros = 0
+        self.throttles = 0
+        self.tempo_total = 0.0
+        self.primeiro_uso = None
+        self.ultimo_uso = None
+
+    def disponivel(self, agora=None):
+        return (agora or time.time()) >= self.ejetado_ate
+
+    def para_requests(self):
+        return {'http': self.url, 'https': self.url}
+
+    def __repr__(self):
+        return f"Proxy({self.url!r})"
+
+
+class PoolProxies:
+    """
+    Pool de proxies com verificação de saúde, atribuição fixa por driver e rotação.
+
+    - `escolher()` distribui as requisições HTTP entre os proxies disponíveis (round-robin).
+    - O GerenciadorDrivers escolhe um proxy ao criar cada driver e o mantém até reciclar.
+    - Após `max_falhas` falhas seguidas, ou em caso de bloqueio, o proxy é ejetado por
+      `tempo_ejecao` segundos (dobrando a cada nova ejeção, até 8x) e volta a ser
+      usado depois disso.
+    """
+
+    def __init__(self, urls, max_falhas=3, tempo_ejecao=120, url_teste=URL_TESTE_PADRAO, timeout_teste=10,
+                 verificar_ssl=True):
+        self.proxies = [Proxy(url.strip()) for url in dict.fromkeys(urls) if url and url.strip()]
+        if not self.proxies:
+            raise ValueError("O pool de proxies precisa de pelo menos um endpoint.")
+        self.max_falhas = max_falhas
+        self.tempo_ejecao = tempo_ejecao
+        self.url_teste = url_teste
+        self.timeout_teste = timeout_teste
+        # Proxies corporativos com inspeção TLS exigem desativar a verificação (como no Chrome)
+        self.verificar_ssl = verificar_ssl
+        self._lock = threading.Lock()
+        self._ciclo = itertools.cycle(self.proxies)
+
+    def _ejetar(self, proxy, motivo):
+        fator = min(2 ** proxy.ejecoes, 8)
+        proxy.ejetado_ate = time.time() + self.tempo_ejecao * fator
+        proxy.ejecoes += 1
+        proxy.falhas_seguidas = 0
+        logger.warning("Proxy %s ejetado por %ss (%s).", proxy.url, self.tempo_ejecao * fator, motivo)
+
+    def verificar_saude(self):
+        """Testa todos os proxies em paralelo e ejeta os que não respondem."""
+        def testar(proxy):
+            inicio = time.monotonic()
+            try:
+                resp = requests.get(self.url_teste, proxies=proxy.para_requests(), timeout=self.timeout_teste,
+                                    verify=self.verificar_ssl)
+                return proxy, resp.status_code < 400, f"HTTP {resp.status_code}", time.monotonic() - inicio
+            except Exception as e:
+                return proxy, False, str(e), time.monotonic() - inicio
+
+        with ThreadPoolExecutor(max_workers=len(self.proxies)) as executor:
+            resultados = list(executor.map(testar, self.proxies))
+
+        saudaveis = 0
+        with self._lock:
+            for proxy, ok, detalhe, duracao in resultados:
+                if ok:
+                    saudaveis += 1
+                    logger.info("Proxy %s saudável (%.2fs).", proxy.url, duracao)
+                else:
+                    self._ejetar(proxy, f"falha na verificação de saúde: {detalhe}")
+        logger.info("Pool de proxies: %s de %s saudáveis.", saudaveis, len(self.proxies))
+        return saudaveis
+
+    def escolher(self):
+        """Próximo proxy disponível; se todos estiverem ejetados, o que volta primeiro."""
+        with self._lock:
+            agora = time.time()
+            for _ in range(len(self.proxies)):
+                proxy = next(self._ciclo)
+                if proxy.disponivel(agora):
+                    return proxy
+            return min(self.proxies, key=lambda p: p.ejetado_ate)
+
+    def registrar_sucesso(self, proxy, duracao=0.0):
+        if proxy is None:
+            return
+        with self._lock:
+            agora = time.time()
+            proxy.requisicoes += 1
+            proxy.tempo_total += duracao
+            proxy.falhas_seguidas = 0
+            proxy.primeiro_uso = proxy.primeiro_uso or agora - duracao
+            proxy.ultimo_uso = agora
+
+    def registrar_falha(self, proxy, duracao=0.0, throttle=False):
+        """Registra uma falha. Retorna True se o proxy foi ejetado."""
+        if proxy is None:
+            return False
+        with self._lock:
+            agora = time.time()
+            proxy.requisicoes += 1
+            proxy.erros += 1
+            proxy.tempo_total += duracao
+            proxy.primeiro_uso = proxy.primeiro_uso or agora - duracao
+            proxy.ultimo_uso = agora
+            if throttle:
+                proxy.throttles += 1
+                self._ejetar(proxy, "bloqueio/limitação de taxa")
+                return True
+            proxy.falhas_seguidas += 1
+            if proxy.falhas_seguidas >= self.max_falhas:
+                self._ejetar(proxy, f"{proxy.falhas_seguidas} falhas seguidas")
+                return True
+            return False
+
+    def requisitar(self, funcao, url, **kwargs):
+        """
+        Executa `funcao(url, proxies=..., **kwargs)` (ex: requests.head, Session.get) por um proxy do pool,
+        registrando o resultado. Respostas de bloqueio contam como throttle.
+        """
+        proxy = self.escolher()
+        kwargs.setdefault('verify', self.verificar_ssl)
+        inicio = time.monotonic()
+        try:
+            resp = funcao(url, proxies=proxy.para_requests(), **kwargs)
+        except Exception:
+            self.registrar_falha(proxy, time.monotonic() - inicio)
+            raise
+        if resp.status_code in STATUS_THROTTLE:
+            self.registrar_falha(proxy, time.monotonic() - inicio, throttle=True)
+        elif resp.status_code in STATUS_FALHA_PROXY:
+            self.registrar_falha(proxy, time.monotonic() - inicio)
+        else:
+            self.registrar_sucesso(proxy, time.monotonic() - inicio)
+        return resp
+
+    def relatorio(self):
+        """Métricas por proxy: requisições, erros, throttles, vazão e latência média."""
+        linhas = []
+        with self._lock:
+            for proxy in self.proxies:
+                janela = (proxy.ultimo_uso - proxy.primeiro_uso) if proxy.primeiro_uso else 0
+                linhas.append({
+                    'proxy': proxy.url,
+                    'requisicoes': proxy.requisicoes,
+                    'erros': proxy.erros,
+                    'throttles': proxy.throttles,
+                    'ejecoes': proxy.ejecoes,
+                    'taxa_erro': round(proxy.erros / proxy.requisicoes, 3) if proxy.requisicoes else 0.0,
+                    'req_por_min': round(proxy.requisicoes / janela * 60, 1) if janela > 0 else 0.0,
+                    'latencia_media': round(proxy.tempo_total / proxy.requisicoes, 2) if proxy.requisicoes else 0.0,
+                })
+        return linhas
+
+    def registrar_relatorio(self):
+        for linha in self.relatorio():
+            logger.info("Proxy %(proxy)s: %(requisicoes)s req, %(erros)s erros (%(taxa_erro)s), "
+                        "%(throttles)s throttles, %(ejecoes)s ejeções, %(req_por_min)s req/min, "
+                        "latência média %(latencia_media)ss", linha)
+
+
+# Pool usado pelos clientes HTTP da coleta; None enquanto não houver proxies configurados
+_pool = None
+
+
+def configurar(urls, verificar=True, **kwargs):
+    """Cria o pool compartilhado a partir de uma lista de URLs de proxy."""
+    global _pool
+    _pool = PoolProxies(urls, **kwargs)
+    if verificar:
+        _pool.verificar_saude()
+    return _pool
+
+
+def obter():
+    return _pool
+
+
+def requisitar(funcao, url, **kwargs):
+    """Executa a requisição pelo pool configurado ou diretamente, se não houver pool."""
+    if _pool is None:
+        return funcao(url, **kwargs)
+    return _pool.requisitar(funcao, url, **kwargs)
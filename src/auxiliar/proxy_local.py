@@ -0,0 +1,140 @@
+"""
+Proxies HTTP locais para testar o pool de proxies sem depender de saídas reais.
+
+Cada proxy encaminha requisições HTTP (GET/HEAD com URL absoluta) e túneis HTTPS
+(CONNECT), com latência adicional e fração de respostas 429 configuráveis.
+
+Exemplo:
+    python -m auxiliar.proxy_local --porta 8901 --quantidade 3 --taxa-throttle 0.1
+    (e no .env: PROXY_URLS=http://127.0.0.1:8901,http://127.0.0.1:8902,http://127.0.0.1:8903)
+"""
+
+import argparse
+import http.client
+import random
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+class _HandlerProxy(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _simular(self):
+        """Aplica latência e throttle configurados. Retorna False se respondeu 429."""
+        servidor = self.server
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+        with servidor.lock:
+            servidor.requisicoes += 1
+        if servidor.taxa_throttle and random.random() < servidor.taxa_throttle:
+            with servidor.lock:
+                servidor.throttles += 1
+            self.send_response(429)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return False
+        return True
+
+    def do_CONNECT(self):
+        if not self._simular():
+            return
+        host, _, porta = self.path.partition(':')
+        try:
+            destino = socket.create_connection((host, int(porta or 443)), timeout=30)
+        except OSError:
+            self.send_error(502)
+            return
+        self.send_response(200, 'Connection established')
+        self.end_headers()
+        conexoes = [self.connection, destino]
+        try:
+            while True:
+                prontos, _, erro = select.select(conexoes, [], conexoes, 60)
+                if erro or not prontos:
+                    break
+                for origem in prontos:
+                    dados = origem.recv(65536)
+                    if not dados:
+                        return
+                    (destino if origem is self.connection else self.connection).sendall(dados)
+        finally:
+            destino.close()
+            self.close_connection = True
+
+    def _encaminhar(self):
+        if not self._simular():
+            return
+        partes = urlsplit(self.path)
+        if not partes.hostname:
+            self.send_error(400, 'URL absoluta esperada')
+            return
+        classe = http.client.HTTPSConnection if partes.scheme == 'https' else http.client.HTTPConnection
+        caminho = partes.path or '/'
+        if partes.query:
+            caminho += '?' + partes.query
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        corpo = self.rfile.read(tamanho) if tamanho else None
+        cabecalhos = {k: v for k, v in self.headers.items() if k.lower() not in ('proxy-connection', 'connection')}
+        try:
+            conexao = classe(partes.hostname, partes.port, timeout=30)
+            conexao.request(self.command, caminho, body=corpo, headers=cabecalhos)
+            resp = conexao.getresponse()
+            dados = resp.read()
+        except OSError:
+            self.send_error(502)
+            return
+        self.send_response(resp.status, resp.reason)
+        for chave, valor in resp.getheaders():
+            if chave.lower() not in ('transfer-encoding', 'connection', 'content-length'):
+                self.send_header(chave, valor)
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(dados)
+
+    do_GET = _encaminhar
+    do_HEAD = _encaminhar
+    do_POST = _encaminhar
+
+
+def iniciar_proxy(porta=0, latencia=0.0, taxa_throttle=0.0, host='127.0.0.1'):
+    """
+    Inicia um proxy local em uma thread. Retorna o servidor (URL em `servidor.url`).
+    Use `servidor.shutdown()` para encerrar.
+    """
+    servidor = ThreadingHTTPServer((host, porta), _HandlerProxy)
+    servidor.daemon_threads = True
+    servidor.latencia = latencia
+    servidor.taxa_throttle = taxa_throttle
+    servidor.lock = threading.Lock()
+    servidor.requisicoes = 0
+    servidor.throttles = 0
+    servidor.url = f"http://{host}:{servidor.server_address[1]}"
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inicia proxies HTTP locais para testes do pool de proxies.")
+    parser.add_argument("--porta", type=int, default=8901, help="Porta do primeiro proxy. Padrão é 8901.")
+    parser.add_argument("--quantidade", type=int, default=2, help="Quantidade de proxies. Padrão é 2.")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Latência adicional por requisição (s).")
+    parser.add_argument("--taxa-throttle", type=float, default=0.0, help="Fração de requisições respondidas com 429.")
+    args = parser.parse_args()
+
+    servidores = [iniciar_proxy(args.porta + i, args.latencia, args.taxa_throttle) for i in range(args.quantidade)]
+    print("PROXY_URLS=" + ",".join(s.url for s in servidores))
+    try:
+        while True:
+            time.sleep(10)
+            print(" | ".join(f"{s.url}: {s.requisicoes} req, {s.throttles} 429" for s in servidores))
+    except KeyboardInterrupt:
+        for s in servidores:
+            s.shutdown()
@@ -0,0 +1,117 @@
+import sys
+
+# Ordem das colunas das notícias coletadas (Excel, banco e DataFrames)
+CAMPOS = (
+    'titulo',
+    'conteudo',
+    'fonte',
+    'datetime',
+    'link',
+    'img_url',
+    'img_url_original',
+    'palavra_chave',
+    'municipios_citados',
+)
+
+# Campos com poucos valores distintos repetidos em milhares de notícias
+CAMPOS_INTERNADOS = ('fonte', 'datetime', 'palavra_chave')
+
+
+def _internar(valor):
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+
+class Noticia:
+    """
+    Registro compacto de uma notícia coletada.
+
+    Usa __slots__ (sem __dict__ por instância) e internaliza as strings repetidas
+    (fonte, data e palavra-chave), que se repetem em quase todas as notícias de uma busca.
+    """
+
+    __slots__ = CAMPOS
+
+    def __init__(self, titulo, conteudo, fonte, datetime, link, img_url, img_url_original, palavra_chave,
+                 municipios_citados=''):
+        self.titulo = titulo
+        self.conteudo = conteudo
+        self.fonte = _internar(fonte)
+        self.datetime = _internar(datetime)
+        self.link = link
+        self.img_url = img_url
+        self.img_url_original = img_url_original
+        self.palavra_chave = _internar(palavra_chave)
+        self.municipios_citados = municipios_citados
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Cria a notícia a partir de um dict (ex: resultado da fila ou linha de planilha)."""
+        return cls(**{campo: dados.get(campo, '') for campo in CAMPOS})
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in CAMPOS}
+
+    def como_tupla(self):
+        return tuple(getattr(self, campo) for campo in CAMPOS)
+
+    def __eq__(self, outro):
+        return isinstance(outro, Noticia) and self.como_tupla() == outro.como_tupla()
+
+    def __repr__(self):
+        return f"Noticia(titulo={self.titulo!r}, fonte={self.fonte!r}, link={self.link!r})"
+
+
+def separar_municipios(municipios_citados):
+    """
+    Separa 'municipios_citados' ("Nome1-Cod1,Nome2-Cod2") em pares (nome, código).
+
+    Usada por expandir_municipios, que monta as linhas tanto da exportação em Excel
+    quanto da gravação no banco. Um valor vazio gera um único par vazio.
+    """
+    if not isinstance(municipios_citados, str):
+        municipios_citados = '' if municipios_citados is None else str(municipios_citados)
+    pares = []
+    for par in municipios_citados.split(','):
+        # O código fica após o último '-' (nomes como Xique-Xique também têm hífen)
+        nome, _, codigo = par.rpartition('-') if '-' in par else (par, '', '')
+        pares.append((nome.strip(), codigo.strip()))
+    return pares
+
+
+def expandir_municipios(noticias):
+    """
+    Converte as notícias em colunas com uma linha por município citado.
+
+    'municipios_citados' é separado (ver `separar_municipios`) em 'municipios_citados'
+    (nome) e 'codigo_municipio' (código). Notícias sem município geram uma linha com
+    os dois campos vazios.
+
+    Returns:
+        dict: Colunas CAMPOS + 'codigo_municipio'.
+    """
+    colunas = {campo: [] for campo in CAMPOS}
+    colunas['codigo_municipio'] = []
+    demais = [campo for campo in CAMPOS if campo != 'municipios_citados']
+
+    for noticia in noticias:
+        for nome, codigo in separar_municipios(noticia.municipios_citados):
+            for campo in demais:
+                colunas[campo].append(getattr(noticia, campo))
+            colunas['municipios_citados'].append(nome)
+            colunas['codigo_municipio'].append(codigo)
+    return colunas
+
+
+def para_dataframe(colunas):
+    """DataFrame do pandas a partir de colunas (dict de listas), sem passar por linhas."""
+    import pandas as pd
+    return pd.DataFrame(colunas, columns=list(colunas.keys()))
+
+
+def para_arrow(colunas):
+    """Tabela do pyarrow a partir de colunas (dict de listas). Requer pyarrow instalado."""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("pyarrow não está instalado. Instale com: pip install pyarrow") from e
+    return pa.table(colunas)
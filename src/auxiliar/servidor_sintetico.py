@@ -0,0 +1,272 @@
+"""
+Servidor HTTP local com páginas de resultados sintéticas, para testes de carga sem acessar as fontes reais.
+
+Reproduz o layout das duas fontes suportadas:
+- google_news: `/search?q=...`, itens em `div.UW0SDc` (título em `a.JtKRv`, data em `time[datetime]`),
+  com rolagem infinita (novos lotes carregados ao chegar ao fim da página).
+- portal_atarde: `/?q=...`, itens em `.chamadaUltimasNoticias` e botão `.atr-maisNoticias`.
+
+Também serve as páginas das notícias (`/articles/<id>`, para --buscar-artigos) e as imagens
+(`/img/<id>.jpg`), com uma fração configurável de respostas que não são imagem ou são erro.
+
+Exemplo:
+    python -m auxiliar.servidor_sintetico --porta 8800 --itens 200 --latencia 0.1
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Amostra fixa de municípios para os títulos (o servidor não depende do gazetteer nem do spaCy)
+MUNICIPIOS = (
+    "Salvador", "Feira de Santana", "Vitória da Conquista", "Camaçari", "Itabuna", "Juazeiro", "Ilhéus",
+    "Lauro de Freitas", "Jequié", "Teixeira de Freitas", "Barreiras", "Alagoinhas", "Porto Seguro",
+    "Simões Filho", "Paulo Afonso", "Eunápolis", "Santo Antônio de Jesus", "Valença", "Irecê", "Jacobina",
+    "Xique-Xique", "Senhor do Bonfim", "Guanambi", "Bom Jesus da Lapa", "Serrinha",
+)
+
+ASSUNTOS = (
+    "Prefeitura é investigada por fraude em licitação",
+    "MP apura desvio de recursos da saúde",
+    "Operação cumpre mandados contra servidores",
+    "TCM rejeita contas do ex-prefeito",
+    "Câmara abre CPI sobre contratos emergenciais",
+    "Justiça bloqueia bens de empresários",
+)
+
+PUBLICADORES = ("G1 Bahia", "Bahia Notícias", "Correio", "Metro1", "BNews", "A Tarde")
+
+CSS = "body{font-family:sans-serif} .UW0SDc,.chamadaUltimasNoticias{display:block;min-height:140px;margin:8px 0}"
+
+SCRIPT_ROLAGEM = """
+<script>
+let offset = %(offset)d, carregando = false, fim = offset >= %(total)d;
+window.addEventListener('scroll', () => {
+  if (fim || carregando) return;
+  if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+  carregando = true;
+  fetch('/api/google?q=%(q)s&offset=' + offset).then(r => r.text()).then(t => {
+    document.getElementById('resultados').insertAdjacentHTML('beforeend', t);
+    offset += %(lote)d; fim = offset >= %(total)d; carregando = false;
+  });
+});
+</script>
+"""
+
+SCRIPT_BOTAO = """
+<script>
+let offset = %(offset)d;
+document.querySelector('.atr-maisNoticias').addEventListener('click', (e) => {
+  const botao = e.currentTarget;
+  fetch('/api/atarde?q=%(q)s&offset=' + offset).then(r => r.text()).then(t => {
+    botao.insertAdjacentHTML('beforebegin', t);
+    offset += %(lote)d;
+    if (offset >= %(total)d) botao.remove();
+  });
+});
+</script>
+"""
+
+
+def _gerador(*partes):
+    return random.Random(hashlib.sha1("|".join(map(str, partes)).encode('utf-8')).hexdigest())
+
+
+class _HandlerSintetico(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- geração dos itens ---
+
+    def _item(self, q, indice):
+        """Dados determinísticos do item `indice` da busca `q` (alguns itens se repetem entre buscas)."""
+        servidor = self.server
+        rnd = _gerador(q, indice)
+        if rnd.random() < servidor.taxa_repetidas:
+            ide = f"comum-{rnd.randrange(max(servidor.itens, 1))}"
+        else:
+            ide = f"{hashlib.sha1(q.encode('utf-8')).hexdigest()[:10]}-{indice}"
+        rnd = _gerador(ide)
+        municipio = rnd.choice(MUNICIPIOS)
+        publicado = datetime.now(timezone.utc) - timedelta(days=rnd.randrange(20), minutes=rnd.randrange(1440))
+        return {
+            'id': ide,
+            'titulo': f"{rnd.choice(ASSUNTOS)} em {municipio}",
+            'resumo': f"Caso em {municipio} envolve contratos de {rnd.randrange(1, 90)} milhões. Busca: {q}.",
+            'publicador': rnd.choice(PUBLICADORES),
+            'publicado': publicado,
+        }
+
+    def _itens_google(self, q, inicio, fim):
+        partes = []
+        for i in range(inicio, min(fim, self.server.itens)):
+            item = self._item(q, i)
+            img = f"/img/{item['id']}.jpg"
+            partes.append(
+                f'<div class="UW0SDc">'
+                f'<img class="Quavad vwBmvb" src="{img}" srcset="{img}?w=100 1x, {img}?w=200 2x">'
+                f'<a class="JtKRv" href="./articles/{item["id"]}">{html.escape(item["titulo"])}</a>'
+                f'<div class="vr1PYe">{html.escape(item["publicador"])}</div>'
+                f'<time class="hvbAAd" datetime="{item["publicado"].strftime("%Y-%m-%dT%H:%M:%SZ")}">'
+                f'{item["publicado"].strftime("%d/%m")}</time>'
+                f'</div>'
+            )
+        return "".join(partes)
+
+    def _itens_atarde(self, q, inicio, fim):
+        partes = []
+        for i in range(inicio, min(fim, self.server.itens)):
+            item = self._item(q, i)
+            partes.append(
+                f'<a class="chamadaUltimasNoticias" href="{self.server.url}/articles/{item["id"]}">'
+                f'<img src="/img/{item["id"]}.jpg">'
+                f'<h2>{html.escape(item["titulo"])}</h2><p>{html.escape(item["resumo"])}</p>'
+                f'<span>{item["publicado"].strftime("%d/%m/%Y")} às {item["publicado"].strftime("%H:%M")}</span></a>'
+            )
+        return "".join(partes)
+
+    # --- respostas ---
+
+    def _responder(self, status, corpo=b'', tipo='text/html; charset=utf-8', cabecalhos=None):
+        if isinstance(corpo, str):
+            corpo = corpo.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(corpo)
+
+    def _pagina(self, corpo, script=''):
+        return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><style>{CSS}</style></head>"
+                f"<body>{corpo}{script}</body></html>")
+
+    def _imagem(self, ide):
+        servidor = self.server
+        if servidor.latencia_imagem:
+            time.sleep(servidor.latencia_imagem)
+        sorteio = _gerador('img', ide).random()
+        if sorteio < servidor.taxa_imagem_erro:
+            return self._responder(404, 'não encontrada', 'text/plain')
+        if sorteio < servidor.taxa_imagem_erro + servidor.taxa_imagem_invalida:
+            return self._responder(200, self._pagina('<p>não é imagem</p>'))
+        cabecalhos = {'Cache-Control': f'public, max-age={servidor.max_age_imagem}', 'ETag': f'"{ide}"'}
+        if self.headers.get('If-None-Match') == cabecalhos['ETag']:
+            return self._responder(304, b'', servidor.tipo_imagem, cabecalhos)
+        # GIF 1x1 (o Content-Type segue `tipo_imagem`)
+        corpo = bytes.fromhex('47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b')
+        return self._responder(200, corpo, servidor.tipo_imagem, cabecalhos)
+
+    def do_GET(self):
+        servidor = self.server
+        partes = urlsplit(self.path)
+        parametros = parse_qs(partes.query)
+        q = parametros.get('q', [''])[0]
+        offset = int(parametros.get('offset', ['0'])[0])
+        rota = partes.path
+
+        with servidor.lock:
+            servidor.requisicoes[rota.split('/')[1] or 'atarde'] += 1
+        if rota.startswith('/img/'):
+            return self._imagem(rota[len('/img/'):])
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+
+        q_js = json.dumps(q)[1:-1].replace("'", "\\'")
+        if rota == '/search':
+            script = SCRIPT_ROLAGEM % {'offset': servidor.lote, 'total': servidor.itens, 'q': q_js,
+                                       'lote': servidor.lote}
+            corpo = f"<main id='resultados'>{self._itens_google(q, 0, servidor.lote)}</main>"
+            return self._responder(200, self._pagina(corpo, script))
+        if rota == '/api/google':
+            return self._responder(200, self._itens_google(q, offset, offset + servidor.lote))
+        if rota == '/':
+            script = SCRIPT_BOTAO % {'offset': servidor.lote, 'total': servidor.itens, 'q': q_js,
+                                     'lote': servidor.lote}
+            corpo = (f"<div id='resultados'>{self._itens_atarde(q, 0, servidor.lote)}"
+                     f"<button class='atr-maisNoticias'>Mais notícias</button></div>")
+            return self._responder(200, self._pagina(corpo, script if servidor.itens > servidor.lote else ''))
+        if rota == '/api/atarde':
+            return self._responder(200, self._itens_atarde(q, offset, offset + servidor.lote))
+        if rota.startswith('/articles/'):
+            rnd = _gerador(rota)
+            paragrafos = "".join(
+                f"<p>{html.escape(rnd.choice(ASSUNTOS))} em {rnd.choice(MUNICIPIOS)}, segundo o Ministério Público. "
+                f"Os contratos investigados somam {rnd.randrange(1, 90)} milhões de reais.</p>"
+                for _ in range(servidor.paragrafos)
+            )
+            return self._responder(200, self._pagina(f"<nav>Menu</nav><article>{paragrafos}</article>"
+                                                     f"<footer>Rodapé</footer>"))
+        return self._responder(404, 'não encontrado', 'text/plain')
+
+    do_HEAD = do_GET
+
+
+def iniciar_servidor(porta=0, host='127.0.0.1', itens=100, lote=20, latencia=0.0, latencia_imagem=0.0,
+                     taxa_imagem_invalida=0.1, taxa_imagem_erro=0.05, tipo_imagem='image/jpeg', max_age_imagem=86400,
+                     taxa_repetidas=0.2, paragrafos=8):
+    """
+    Inicia o servidor sintético em uma thread. Retorna o servidor (URL em `servidor.url`,
+    contagem de requisições por rota em `servidor.requisicoes`). Use `servidor.shutdown()` para encerrar.
+
+    Args:
+        itens: itens por busca (total, somando os lotes).
+        lote: itens na página inicial e em cada carregamento (rolagem ou botão).
+        latencia: atraso em segundos das páginas e lotes; latencia_imagem, das imagens.
+        taxa_imagem_invalida / taxa_imagem_erro: fração das imagens servidas como HTML / HTTP 404.
+        tipo_imagem, max_age_imagem: Content-Type e Cache-Control (max-age) das imagens válidas.
+        taxa_repetidas: fração de itens que se repetem entre buscas diferentes.
+    """
+    servidor = ThreadingHTTPServer((host, porta), _HandlerSintetico)
+    servidor.daemon_threads = True
+    servidor.itens = itens
+    servidor.lote = max(lote, 1)
+    servidor.latencia = latencia
+    servidor.latencia_imagem = latencia_imagem
+    servidor.taxa_imagem_invalida = taxa_imagem_invalida
+    servidor.taxa_imagem_erro = taxa_imagem_erro
+    servidor.tipo_imagem = tipo_imagem
+    servidor.max_age_imagem = max_age_imagem
+    servidor.taxa_repetidas = taxa_repetidas
+    servidor.paragrafos = paragrafos
+    servidor.lock = threading.Lock()
+    servidor.requisicoes = Counter()
+    servidor.url = f"http://{host}:{servidor.server_address[1]}"
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local de páginas de notícias sintéticas.")
+    parser.add_argument("--porta", type=int, default=8800, help="Porta do servidor. Padrão é 8800.")
+    parser.add_argument("--itens", type=int, default=100, help="Itens por busca. Padrão é 100.")
+    parser.add_argument("--lote", type=int, default=20, help="Itens por carregamento. Padrão é 20.")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Atraso das páginas (s).")
+    parser.add_argument("--latencia-imagem", type=float, default=0.0, help="Atraso das imagens (s).")
+    parser.add_argument("--taxa-imagem-invalida", type=float, default=0.1, help="Fração de imagens servidas como HTML.")
+    parser.add_argument("--taxa-imagem-erro", type=float, default=0.05, help="Fração de imagens com HTTP 404.")
+    parser.add_argument("--tipo-imagem", default="image/jpeg", help="Content-Type das imagens válidas.")
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.porta, itens=args.itens, lote=args.lote, latencia=args.latencia,
+                                latencia_imagem=args.latencia_imagem, taxa_imagem_invalida=args.taxa_imagem_invalida,
+                                taxa_imagem_erro=args.taxa_imagem_erro, tipo_imagem=args.tipo_imagem)
+    print(f"Servidor sintético em {servidor.url} (google_news: /search?q=..., portal_atarde: /?q=...)")
+    try:
+        while True:
+            time.sleep(10)
+            print(" | ".join(f"{rota}: {qtd}" for rota, qtd in servidor.requisicoes.items()))
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,248 @@
+"""
+Teste de carga de ponta a ponta: executa main() contra o servidor sintético local
+(auxiliar.servidor_sintetico), com o banco substituído pelo SQLite (auxiliar.db_local).
+
+Cada combinação dos parâmetros informados é uma configuração. Cada configuração roda em
+um subprocesso próprio, para que o pico de memória de uma não contamine a outra, e relata
+notícias por segundo, latência por busca (p50/p90/p99) e pico de memória.
+
+Exemplo:
+    cd src
+    python -m auxiliar.teste_carga --termos 10 --itens 60 200 --processos-nlp 1 4 --pausa 0.5 2
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from auxiliar.servidor_sintetico import iniciar_servidor
+
+logger = logging.getLogger(__name__)
+
+DIR_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prefixo da linha com o resultado impresso pelo subprocesso
+MARCADOR = "RESULTADO_TESTE_CARGA "
+
+# Parâmetros que aceitam vários valores (um teste por combinação)
+PARAMETROS_VARIAVEIS = ('itens', 'latencia', 'processos_nlp', 'max_paginas_driver', 'pausa')
+
+
+def percentil(valores, p):
+    """Percentil por posição mais próxima (valores em qualquer ordem)."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return round(ordenados[indice], 2)
+
+
+def _memoria_mb():
+    """Pico de RSS deste processo (Python) em MB."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: sem resource
+        return None
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+
+class MonitorMemoriaNavegador:
+    """
+    Amostra periodicamente a memória (RSS) do chromedriver e de todos os processos do Chrome
+    de cada GerenciadorDrivers criado, guardando o pico.
+
+    Os processos do navegador são encerrados (e reaproveitados pelo init) a cada reciclagem,
+    então não aparecem em getrusage(RUSAGE_CHILDREN); a árvore precisa ser lida em vida.
+    """
+
+    def __init__(self, intervalo=0.5):
+        self.intervalo = intervalo
+        self.gerenciadores = []
+        self.pico_mb = None
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name="monitor-memoria", daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            total = None
+            for gerenciador in list(self.gerenciadores):
+                memoria = gerenciador.memoria_mb()
+                if memoria is not None:
+                    total = (total or 0) + memoria
+            if total is not None and (self.pico_mb is None or total > self.pico_mb):
+                self.pico_mb = total
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+
+
+def executar_configuracao(cfg):
+    """Roda a coleta completa para uma configuração (no subprocesso) e retorna as métricas."""
+    import main
+    from auxiliar import db_local
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho_db = os.path.join(tmp, 'noticias.db')
+        db_local.configurar(caminho_db)
+        main.db = db_local
+        for fonte in main.ROOT_URLS:
+            main.ROOT_URLS[fonte] = cfg['url']
+        for config in main.SOURCE_CONFIG.values():
+            config['pause_time'] = cfg['pausa']
+
+        latencias = []
+        coletar = main.collect_news_for_term
+
+        def coletar_cronometrado(*args, **kwargs):
+            inicio = time.monotonic()
+            try:
+                return coletar(*args, **kwargs)
+            finally:
+                latencias.append(time.monotonic() - inicio)
+
+        main.collect_news_for_term = coletar_cronometrado
+
+        monitor = MonitorMemoriaNavegador()
+
+        class GerenciadorMonitorado(main.GerenciadorDrivers):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                monitor.gerenciadores.append(self)
+
+        main.GerenciadorDrivers = GerenciadorMonitorado
+
+        termos = [f"Fraude Licitação {i + 1}" for i in range(cfg['termos'])]
+        inicio = time.monotonic()
+        with monitor:
+            main.main(termos, os.path.join(tmp, 'saida'), None, sources=cfg['fontes'], use_db=True,
+                      max_paginas_driver=cfg['max_paginas_driver'], processos_nlp=cfg['processos_nlp'],
+                      buscar_artigos=cfg['buscar_artigos'])
+        duracao = time.monotonic() - inicio
+
+        con = sqlite3.connect(caminho_db)
+        noticias, linhas = con.execute("SELECT COUNT(DISTINCT LINK), COUNT(*) FROM NOTICIAS_MUNICIPIOS").fetchone()
+        con.close()
+
+    memoria = _memoria_mb()
+    return {
+        'noticias': noticias,
+        'linhas': linhas,
+        'segundos': round(duracao, 2),
+        'noticias_por_s': round(noticias / duracao, 2) if duracao else 0.0,
+        'buscas': len(latencias),
+        'latencia_p50': percentil(latencias, 50),
+        'latencia_p90': percentil(latencias, 90),
+        'latencia_p99': percentil(latencias, 99),
+        'rss_mb': round(memoria, 1) if memoria is not None else None,
+        'rss_navegador_mb': round(monitor.pico_mb, 1) if monitor.pico_mb is not None else None,
+    }
+
+
+def rodar(configuracoes, nivel_log='WARNING'):
+    """Sobe o servidor de cada configuração, executa a coleta em um subprocesso e junta os resultados."""
+    resultados = []
+    for cfg in configuracoes:
+        servidor = iniciar_servidor(itens=cfg['itens'], lote=cfg['lote'], latencia=cfg['latencia'],
+                                    latencia_imagem=cfg['latencia_imagem'],
+                                    taxa_imagem_invalida=cfg['taxa_imagem_invalida'])
+        try:
+            cfg = dict(cfg, url=servidor.url)
+            logger.info("Executando configuração: %s", cfg)
+            processo = subprocess.run(
+                [sys.executable, '-m', 'auxiliar.teste_carga', '--executar', json.dumps(cfg), '--nivel-log', nivel_log],
+                cwd=DIR_SRC, stdout=subprocess.PIPE, text=True
+            )
+            linha = next((l for l in processo.stdout.splitlines() if l.startswith(MARCADOR)), None)
+            if processo.returncode != 0 or linha is None:
+                logger.error("Configuração falhou (código %s): %s", processo.returncode, cfg)
+                metricas = {'erro': processo.returncode}
+            else:
+                metricas = json.loads(linha[len(MARCADOR):])
+            metricas['requisicoes_servidor'] = dict(servidor.requisicoes)
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+        resultados.append({'configuracao': {k: cfg[k] for k in PARAMETROS_VARIAVEIS}, **metricas})
+    return resultados
+
+
+def _formatar(valor, casas=2):
+    if valor is None:
+        return '-'
+    return f"{valor:.{casas}f}" if isinstance(valor, float) else str(valor)
+
+
+def imprimir_relatorio(resultados):
+    colunas = ('itens', 'latencia', 'processos_nlp', 'max_paginas_driver', 'pausa',
+               'noticias', 'segundos', 'noticias_por_s', 'latencia_p50', 'latencia_p90', 'latencia_p99',
+               'rss_mb', 'rss_navegador_mb')
+    linhas = [[_formatar({**r['configuracao'], **r}.get(c)) for c in colunas] for r in resultados]
+    larguras = [max(len(c), *(len(l[i]) for l in linhas)) for i, c in enumerate(colunas)]
+    print("  ".join(c.ljust(w) for c, w in zip(colunas, larguras)))
+    for linha in linhas:
+        print("  ".join(v.ljust(w) for v, w in zip(linha, larguras)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Teste de carga da coleta contra o servidor sintético local. "
+                    "Parâmetros com vários valores geram uma configuração por combinação."
+    )
+    parser.add_argument("--termos", type=int, default=5, help="Quantidade de termos de busca. Padrão é 5.")
+    parser.add_argument("-f", "--fonte", nargs='+', default=['google_news', 'portal_atarde'],
+                        help="Fontes simuladas. Padrão: google_news portal_atarde.")
+    parser.add_argument("--itens", type=int, nargs='+', default=[60], help="Itens por busca.")
+    parser.add_argument("--lote", type=int, default=20, help="Itens por carregamento (rolagem/botão).")
+    parser.add_argument("--latencia", type=float, nargs='+', default=[0.0], help="Atraso das páginas (s).")
+    parser.add_argument("--latencia-imagem", type=float, default=0.0, help="Atraso das imagens (s).")
+    parser.add_argument("--taxa-imagem-invalida", type=float, default=0.1, help="Fração de imagens inválidas.")
+    parser.add_argument("--processos-nlp", type=int, nargs='+', default=[1], help="Valores de --processos-nlp.")
+    parser.add_argument("--max-paginas-driver", type=int, nargs='+', default=[50],
+                        help="Valores de --max-paginas-driver.")
+    parser.add_argument("--pausa", type=float, nargs='+', default=[2.0],
+                        help="Pausa (s) entre rolagens/cliques de carregamento.")
+    parser.add_argument("--buscar-artigos", action="store_true", help="Baixa também as páginas das notícias.")
+    parser.add_argument("--saida-json", default=None, help="Arquivo para gravar os resultados em JSON.")
+    parser.add_argument("--nivel-log", default="WARNING", help="Nível de log da coleta. Padrão é WARNING.")
+    parser.add_argument("--executar", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from auxiliar.logs import configurar_logs, encerrar_logs
+    configurar_logs(args.nivel_log)
+
+    if args.executar:
+        resultado = executar_configuracao(json.loads(args.executar))
+        encerrar_logs()
+        print(MARCADOR + json.dumps(resultado), flush=True)
+        sys.exit(0)
+
+    base = {
+        'termos': args.termos, 'fontes': args.fonte, 'lote': args.lote, 'latencia_imagem': args.latencia_imagem,
+        'taxa_imagem_invalida': args.taxa_imagem_invalida, 'buscar_artigos': args.buscar_artigos,
+    }
+    valores = [getattr(args, p) for p in PARAMETROS_VARIAVEIS]
+    configuracoes = [dict(base, **dict(zip(PARAMETROS_VARIAVEIS, combinacao)))
+                     for combinacao in itertools.product(*valores)]
+
+    resultados = rodar(configuracoes, nivel_log=args.nivel_log)
+    encerrar_logs()
+    imprimir_relatorio(resultados)
+    if args.saida_json:
+        with open(args.saida_json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
@@ -7,11 +7,14 @@ Utiliza Selenium para automação do navegador, BeautifulSoup para parsing do HT
 
 import sys
 import time
+import functools
+import logging
+import subprocess
+from urllib.parse import quote_plus
 import argparse
 import os
 from datetime import datetime, timedelta
 
-import pandas as pd
 from selenium import webdriver
 import requests
 from dotenv import load_dotenv
@@ -23,12 +26,25 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 
-from auxiliar import pos_processamento
-import auxiliar.definicoes as definicoes
 import auxiliar.db as db
+from auxiliar.navegador import GerenciadorDrivers
+from auxiliar.logs import configurar_logs, contexto_log, definir_contexto
+from auxiliar import extracao_paralela
+from auxiliar.gravacao import GravadorBanco
+from auxiliar import fila_tarefas
+from auxiliar import artigos
+from auxiliar.registros import Noticia, expandir_municipios, para_dataframe
+from auxiliar import cache_municipios
+from auxiliar import cache_http
+from auxiliar import proxies
+from auxiliar.proxies import ProxyBloqueado
+from auxiliar.municipios import get_municipios_metadata
+from auxiliar.planejador_consultas import PlanejadorConsultas
+
+logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-print(BASE_DIR)
+logger.debug("BASE_DIR: %s", BASE_DIR)
 
 dotenv_path = os.path.join(BASE_DIR, '.env')
 load_dotenv(dotenv_path=dotenv_path)
@@ -38,6 +54,8 @@ db_password = os.getenv("DB_PASSWORD")
 db_host = os.getenv("DB_HOST")
 db_encoding = os.getenv("DB_ENCODE")
 proxy_url = os.getenv("PROXY_URL")
+proxy_urls = os.getenv("PROXY_URLS")
+proxy_verify_ssl = (os.getenv("PROXY_VERIFY_SSL") or "true").lower() == 'true'
 
 # URL raiz das fontes
 ROOT_URLS = {
@@ -45,8 +63,44 @@ ROOT_URLS = {
     'portal_atarde': 'https://atarde.com.br'
 }
 
+# Seletores e forma de carregamento de cada fonte
+SOURCE_CONFIG = {
+    'google_news': {
+        'query_format': "/search?q={query_text}&hl=pt-BR&gl=BR&ceid=BR%3Apt-419",
+        'news_elements': "div.UW0SDc, article",
+        'news_items': 'div.UW0SDc, article',
+        'title': 'a.JtKRv, h3 a, h4 a',
+        'content': 'div.GI74Re.nDgy9d, p',
+        'link': "a[href]",
+        'publisher': 'div.vr1PYe, div.wsLqz',
+        'img': 'img.Quavad.vwBmvb',
+        'date': 'time.hvbAAd, time',
+        'load_method': 'scroll',
+        # Limites de consulta usados pelo planejador de buscas por município
+        'query_or': True,
+        'max_query_chars': 1500,
+        'max_query_words': 32
+    },
+    'portal_atarde': {
+        'query_format': "/?q={query_text}",
+        'news_elements': ".chamadaUltimasNoticias",
+        'news_items': '.chamadaUltimasNoticias',
+        'title': 'h2',
+        'content': 'p',
+        'link': '',
+        'publisher': '',
+        'default_publisher': 'A Tarde',
+        'img': 'img',
+        'date': 'span',
+        'load_method': 'click',
+        'load_selector': '.atr-maisNoticias',
+        'query_or': False
+    }
+    # adicionar outras fontes aqui no futuro
+}
+
 # Configuração das opções do Chrome para rodar em modo headless (sem interface gráfica)
-def setup_driver(use_proxy=False):
+def setup_driver(use_proxy=False, dir_perfil=None, proxy=None):
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
@@ -55,12 +109,19 @@ def setup_driver(use_proxy=False):
     chrome_options.add_argument("--log-level=3")  # Suppress browser logs
     chrome_options.add_experimental_option('excludeSwitches', ['enable-logging']) # Suppress devtools listening log
 
-    if use_proxy and proxy_url:
+    # Com pool de proxies, o GerenciadorDrivers informa o proxy fixo deste driver
+    proxy = proxy or (proxy_url if use_proxy else None)
+    if proxy:
         chrome_options.add_argument("--ignore-certificate-errors")
-        chrome_options.add_argument(f"--proxy-server={proxy_url}")
+        chrome_options.add_argument(f"--proxy-server={proxy}")
         chrome_options.add_argument("--proxy-bypass-list=localhost,127.0.0.1,<-loopback>")
         chrome_options.add_argument("--ignore-ssl-errors=yes")
 
+    if dir_perfil:
+        # Perfil persistente: mantém o cache de arquivos estáticos entre execuções
+        chrome_options.add_argument(f"--user-data-dir={dir_perfil}")
+        chrome_options.add_argument(f"--disk-cache-dir={os.path.join(dir_perfil, 'cache')}")
+
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
     return webdriver.Chrome(options=chrome_options)
 
@@ -86,45 +147,51 @@ def normalize_image_url(url: str, root_url: str):
     # Relativa: garante exatamente uma barra entre root e path
     return root_url.rstrip('/') + '/' + url.lstrip('/')
 
-def validar_imagem(url: str, timeout: int = 5):
-    """Valida via HEAD que a URL aponta para uma imagem. Retorna URL final ou None."""
-    try:
-        resp = requests.head(
-            url,
-            allow_redirects=True,
-            timeout=timeout,
-            headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        )
-        content_type = resp.headers.get('Content-Type', '')
-        if resp.status_code == 200 and content_type.startswith('image/'):
-            return resp.url
-        print(f"  IMG REJEITADA: status={resp.status_code} type={content_type} url={url}")
+# Pool de proxies compartilhado pelo navegador e pelos clientes HTTP (None sem proxy)
+def setup_proxy_pool(use_proxy=False):
+    if not use_proxy:
         return None
-    except Exception as e:
-        print(f"  IMG ERRO HEAD: {e} url={url}")
+    urls = [url.strip() for url in (proxy_urls or proxy_url or '').split(',') if url.strip()]
+    if not urls:
+        logger.warning("Proxy habilitado, mas PROXY_URLS/PROXY_URL não estão definidos no .env.")
         return None
+    return proxies.configurar(urls, verificar_ssl=proxy_verify_ssl)
+
+def validar_imagem(url: str, timeout: int = 5):
+    """Valida via HEAD que a URL aponta para uma imagem. Retorna URL final ou None (com cache HTTP)."""
+    def requisitar(cabecalhos):
+        return proxies.requisitar(requests.head, url, allow_redirects=True, timeout=timeout, headers=cabecalhos)
+
+    return cache_http.validar_imagem(url, requisitar)
 
 # Função para carregar a página de busca e aguardar elementos
 def load_search_page(driver, url, selectors):
-    print(f"Acessando: {url}")
+    logger.info("Acessando: %s", url)
     try:
         driver.get(url)
         WebDriverWait(driver, 15).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, selectors['news_elements']))
         )
-        print("Página carregada e elementos de notícias encontrados.")
+        logger.debug("Página carregada e elementos de notícias encontrados.")
     except TimeoutException:
-        print(f"Timeout ao carregar a página de busca. Pulando.")
+        # O Google redireciona saídas limitadas para a página /sorry/ (captcha)
+        if '/sorry/' in (driver.current_url or ''):
+            logger.warning("Busca bloqueada pela fonte (página de captcha).")
+            raise ProxyBloqueado(driver.current_url)
+        logger.warning("Timeout ao carregar a página de busca. Pulando.")
         raise
     except Exception as e:
-        print(f"Erro ao acessar ou carregar a página de busca: {e}. Pulando.")
+        logger.warning("Erro ao acessar ou carregar a página de busca: %s. Pulando.", e)
         raise
 
 # Função para carregar mais conteúdo (scroll ou click em "carregar mais")
 def load_more_content(driver, config, max_loads=20, pause_time=2):
     load_method = config.get('load_method', 'scroll')
+    # Ajustáveis por fonte (ex: teste de carga com servidor local)
+    max_loads = config.get('max_loads', max_loads)
+    pause_time = config.get('pause_time', pause_time)
     count = 0
-    print(f"Iniciando carregamento de mais notícias via {load_method} (max {max_loads})...")
+    logger.debug("Iniciando carregamento de mais notícias via %s (max %s)...", load_method, max_loads)
     if load_method == 'scroll':
         last_height = driver.execute_script("return document.body.scrollHeight")
         while count < max_loads:
@@ -133,10 +200,10 @@ def load_more_content(driver, config, max_loads=20, pause_time=2):
             time.sleep(pause_time)
             new_height = driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
-                print(f"Scroll {count}/{max_loads}: Altura da página não mudou. Fim do conteúdo ou limite atingido.")
+                logger.debug("Scroll %s/%s: Altura da página não mudou. Fim do conteúdo ou limite atingido.", count, max_loads)
                 break
             last_height = new_height
-            print(f"Scroll {count}/{max_loads}: Nova altura da página {new_height}.")
+            logger.debug("Scroll %s/%s: Nova altura da página %s.", count, max_loads, new_height)
     elif load_method == 'click':
         while count < max_loads:
             try:
@@ -148,25 +215,26 @@ def load_more_content(driver, config, max_loads=20, pause_time=2):
                 driver.execute_script("arguments[0].click();", button)
                 count += 1
                 time.sleep(pause_time)
-                print(f"Click {count}/{max_loads}: Carregando mais notícias.")
+                logger.debug("Click %s/%s: Carregando mais notícias.", count, max_loads)
             except TimeoutException:
-                print(f"Click {count}/{max_loads}: Botão 'carregar mais' não encontrado ou fim do conteúdo.")
+                logger.debug("Click %s/%s: Botão 'carregar mais' não encontrado ou fim do conteúdo.", count, max_loads)
                 break
             except Exception as e:
-                print(f"Erro ao clicar no botão: {e}")
+                logger.warning("Erro ao clicar no botão: %s", e)
                 break
-    print("Carregamento de mais conteúdo concluído.")
+    logger.debug("Carregamento de mais conteúdo concluído.")
 
 # Função para parsear o HTML e extrair notícias
-def parse_news_items(html, search_term, root_url, seen_links, news, config):
+def parse_news_items(html, search_term, root_url, seen_links, news, config, extrair_municipios=True):
     soup = BeautifulSoup(html, 'html.parser')
     news_items = soup.select(config['news_items'])
-    print(f"Total de elementos de notícias encontrados: {len(news_items)}")
+    logger.debug("Total de elementos de notícias encontrados: %s", len(news_items))
 
     if not news_items:
-        print(f"Nenhum item de notícia encontrado para a busca '{search_term}'.")
-        return
+        logger.info("Nenhum item de notícia encontrado para a busca '%s'.", search_term)
+        return 0, 0
 
+    adicionadas = 0
     for i, item in enumerate(news_items):
         item_link = None
         try:
@@ -209,12 +277,12 @@ def parse_news_items(html, search_term, root_url, seen_links, news, config):
                         datetime_obj = datetime.fromisoformat(datetime_string)
                         data_publicacao = datetime_obj.strftime('%d/%m/%Y')
                         ano_filtro = int(datetime_obj.strftime('%Y'))
-                        print(f"Data de publicação parseada: {data_publicacao}")
+                        logger.debug("Data de publicação parseada: %s", data_publicacao)
                     except ValueError as ve:
-                        print(f"Erro ao parsear data '{datetime_string}': {ve}")
+                        logger.debug("Erro ao parsear data '%s': %s", datetime_string, ve)
                         data_publicacao = datetime_string
                     except Exception as ex:
-                        print(f"Erro inesperado ao processar data '{datetime_string}': {ex}")
+                        logger.debug("Erro inesperado ao processar data '%s': %s", datetime_string, ex)
                         data_publicacao = datetime_string
                 else:
                     # Parsing de texto para fontes como A Tarde
@@ -225,37 +293,27 @@ def parse_news_items(html, search_term, root_url, seen_links, news, config):
                         datetime_obj = datetime.strptime(data_publicacao, '%d/%m/%Y')
                         data_publicacao = datetime_obj.strftime('%d/%m/%Y')
                         ano_filtro = datetime_obj.year
-                        print(f"Data de publicação parseada do texto: {data_publicacao}")
+                        logger.debug("Data de publicação parseada do texto: %s", data_publicacao)
                     except Exception as e:
-                        print(f"Erro ao parsear data do texto '{date_text}': {e}")
+                        logger.debug("Erro ao parsear data do texto '%s': %s", date_text, e)
                         data_publicacao = date_text
 
             raw_url = (
                 parse_srcset(img_tag.get('srcset')) if img_tag and img_tag.get('srcset')
                 else (img_tag.get('src') if img_tag else None)
             )
-            print(f"  IMG SRC BRUTO: srcset={repr(img_tag.get('srcset') if img_tag else None)} src={repr(img_tag.get('src') if img_tag else None)}")
+            if img_tag is not None:
+                logger.debug("  IMG SRC BRUTO: srcset=%r src=%r", img_tag.get('srcset'), img_tag.get('src'))
             img_url_original = normalize_image_url(raw_url, root_url) if raw_url else 'Imagem não encontrada'
             validated = validar_imagem(img_url_original) if img_url_original != 'Imagem não encontrada' else None
             img_url = validated if validated else 'Imagem não encontrada'
 
-            municipios_potential = definicoes.get_municipios_from_title(title, content)
+            # Com a extração em lote (processos), os municípios são preenchidos depois da coleta
+            municipios_potential = cache_municipios.extrair(title, content) if extrair_municipios else []
             municipios_string = ",".join(municipios_potential) if municipios_potential else ""
 
-            item_dict = {
-                'titulo': title,
-                'conteudo': content,
-                'fonte': publisher,
-                'datetime': data_publicacao,
-                'link': item_link,
-                'img_url': img_url,
-                'img_url_original': img_url_original,
-                'palavra_chave': search_term,
-                'municipios_citados': municipios_string
-            }
-
             if ano_filtro is not None and ano_filtro < 2023:
-                print(f"Ignorando notícia de ano {ano_filtro} (menor que 2023).")
+                logger.debug("Ignorando notícia de ano %s (menor que 2023).", ano_filtro)
                 continue
 
             if config.get('default_publisher') == 'A Tarde':
@@ -263,146 +321,279 @@ def parse_news_items(html, search_term, root_url, seen_links, news, config):
                     parsed_datetime = datetime.strptime(data_publicacao, '%d/%m/%Y')
                     limite_30_dias = datetime.now() - timedelta(days=30)
                     if parsed_datetime < limite_30_dias:
-                        print(f"Ignorando notícia de {data_publicacao} (mais de 30 dias) do portal A Tarde.")
+                        logger.debug("Ignorando notícia de %s (mais de 30 dias) do portal A Tarde.", data_publicacao)
                         continue
                 except Exception as e:
                     pass
 
-            news.append(item_dict)
-
-            print("\n============================================== NOTÍCIA ===================================================")
-            print(f"TÍTULO: {item_dict['titulo']}")
-            print(f"CONTEÚDO: {item_dict['conteudo'][:200]}...")
-            print(f"MUNICÍPIOS CITADOS ({len(municipios_potential)}): {item_dict['municipios_citados']}")
-            print(f"FONTE: {item_dict['fonte']}")
-            print(f"DATA: {item_dict['datetime']}")
-            print(f"LINK: {item_dict['link']}")
-            print(f"IMAGEM (final): {item_dict['img_url']}")
-            print(f"IMAGEM (original): {item_dict['img_url_original']}")
-            print(f"PALAVRA-CHAVE: {item_dict['palavra_chave']}")
+            noticia = Noticia(
+                titulo=title,
+                conteudo=content,
+                fonte=publisher,
+                datetime=data_publicacao,
+                link=item_link,
+                img_url=img_url,
+                img_url_original=img_url_original,
+                palavra_chave=search_term,
+                municipios_citados=municipios_string
+            )
+            news.append(noticia)
+            adicionadas += 1
+
+            logger.debug(
+                "\n============================================== NOTÍCIA ===================================================\n"
+                "TÍTULO: %s\nCONTEÚDO: %s...\nMUNICÍPIOS CITADOS (%s): %s\nFONTE: %s\nDATA: %s\nLINK: %s\n"
+                "IMAGEM (final): %s\nIMAGEM (original): %s\nPALAVRA-CHAVE: %s",
+                noticia.titulo, noticia.conteudo[:200], len(municipios_potential),
+                noticia.municipios_citados, noticia.fonte, noticia.datetime, noticia.link,
+                noticia.img_url, noticia.img_url_original, noticia.palavra_chave
+            )
         except Exception as e:
-            print(f"Erro ao processar item: {e}")
+            logger.warning("Erro ao processar item: %s", e)
             continue
 
-# Função para coletar notícias de uma fonte específica
-def collect_news_from_source(driver, search_terms, source='google_news'):
+    return len(news_items), adicionadas
+
+# Função para coletar notícias de um termo em uma fonte específica
+def collect_news_for_term(gerenciador, palavra, source, seen_links, news, extrair_municipios=True, palavra_chave=None):
     root_url = ROOT_URLS.get(source, 'https://news.google.com')
+    config = SOURCE_CONFIG.get(source)
+    if not config:
+        raise ValueError(f"Fonte '{source}' não suportada. Adicione configurações para ela.")
+
+    logger.debug("\n--- Buscando notícias para: %s em %s ---", palavra, source)
+    query_text = quote_plus(palavra)
+    link = f"{root_url}{config['query_format'].format(query_text=query_text)}"
+
+    def carregar_pagina(driver):
+        load_search_page(driver, link, config)
+        load_more_content(driver, config)
+        return driver.page_source
+
+    inicio = time.monotonic()
+    html = gerenciador.executar(carregar_pagina)
+    total_itens, adicionadas = parse_news_items(html, palavra_chave or palavra, root_url, seen_links, news, config,
+                                               extrair_municipios=extrair_municipios)
+    logger.info("Termo '%s' em %s: %s itens na página, %s notícias novas (%.1fs).",
+                palavra, source, total_itens, adicionadas, time.monotonic() - inicio)
+    return total_itens, adicionadas
+
+# Função para coletar notícias de uma fonte específica
+def collect_news_from_source(gerenciador, search_terms, source='google_news', extrair_municipios=True, ao_coletar=None):
+    if source not in SOURCE_CONFIG:
+        raise ValueError(f"Fonte '{source}' não suportada. Adicione configurações para ela.")
+
     seen_links = set()
     news = []
 
-    source_config = {
-        'google_news': {
-            'query_format': "/search?q={query_text}&hl=pt-BR&gl=BR&ceid=BR%3Apt-419",
-            'news_elements': "div.UW0SDc, article",
-            'news_items': 'div.UW0SDc, article',
-            'title': 'a.JtKRv, h3 a, h4 a',
-            'content': 'div.GI74Re.nDgy9d, p',
-            'link': "a[href]",
-            'publisher': 'div.vr1PYe, div.wsLqz',
-            'img': 'img.Quavad.vwBmvb',
-            'date': 'time.hvbAAd, time',
-            'load_method': 'scroll'
-        },
-        'portal_atarde': {
-            'query_format': "/?q={query_text}",
-            'news_elements': ".chamadaUltimasNoticias",
-            'news_items': '.chamadaUltimasNoticias',
-            'title': 'h2',
-            'content': 'p',
-            'link': '',
-            'publisher': '',
-            'default_publisher': 'A Tarde',
-            'img': 'img',
-            'date': 'span',
-            'load_method': 'click',
-            'load_selector': '.atr-maisNoticias'
-        }
-        # adicionar outras fontes aqui no futuro
-    }
+    for palavra in search_terms:
+        with contexto_log(fonte=source, termo=palavra):
+            try:
+                inicio = len(news)
+                collect_news_for_term(gerenciador, palavra, source, seen_links, news,
+                                      extrair_municipios=extrair_municipios)
+                if ao_coletar and len(news) > inicio:
+                    ao_coletar(news[inicio:])
+            except Exception as e:
+                logger.error("Erro ao processar busca para '%s' em %s: %s", palavra, source, e)
+                continue
 
-    config = source_config.get(source)
+    logger.info("Quantidade total de notícias encontradas em %s: %s", source, len(news))
+    return news
+
+# Função para coletar notícias com buscas município × tópico planejadas em consultas OR
+def collect_news_planned(gerenciador, topicos, source='google_news', extrair_municipios=True, ao_coletar=None):
+    config = SOURCE_CONFIG.get(source)
     if not config:
         raise ValueError(f"Fonte '{source}' não suportada. Adicione configurações para ela.")
 
-    try:
-        for palavra in search_terms:
-            print(f"\n--- Buscando notícias para: {palavra} em {source} ---")
-            query_text = palavra.replace(' ', '+')
-            link = f"{root_url}{config['query_format'].format(query_text=query_text)}"
+    planejador = PlanejadorConsultas.para_fonte(topicos, list(get_municipios_metadata().keys()), config)
+    seen_links = set()
+    news = []
 
+    for grupo in planejador:
+        with contexto_log(fonte=source, termo=grupo.topico):
             try:
-                load_search_page(driver, link, config)
-                load_more_content(driver, config)
-                html = driver.page_source
-                parse_news_items(html, palavra, root_url, seen_links, news, config)
+                inicio = len(news)
+                total_itens, _ = collect_news_for_term(gerenciador, grupo.consulta, source, seen_links, news,
+                                                       extrair_municipios=extrair_municipios,
+                                                       palavra_chave=grupo.topico)
+                planejador.registrar(grupo, total_itens)
+                if ao_coletar and len(news) > inicio:
+                    ao_coletar(news[inicio:])
             except Exception as e:
-                print(f"Erro ao processar busca para '{palavra}' em {source}: {e}")
+                logger.error("Erro ao processar busca planejada %r em %s: %s", grupo, source, e)
                 continue
-    finally:
-        driver.quit()
 
-    print(f"Quantidade total de notícias encontradas em {source}: {len(news)}")
+    logger.info("Buscas planejadas em %s: %s", source, planejador.resumo())
+    logger.info("Quantidade total de notícias encontradas em %s: %s", source, len(news))
     return news
 
+# Coordenador: enfileira (fonte, termo), dispara workers locais e junta os resultados
+def coordinate_queue(fila_url, search_terms, sources, ide_execucao=None, workers=1, args_worker=(),
+                     extrair_municipios=True):
+    for source in sources:
+        if source not in SOURCE_CONFIG:
+            raise ValueError(f"Fonte '{source}' não suportada. Adicione configurações para ela.")
+
+    fila = fila_tarefas.abrir_fila(fila_url)
+    execucao = fila.nova_execucao(ide_banco=ide_execucao, extrair_municipios=extrair_municipios)
+    fila.enfileirar(execucao, [(source, palavra) for source in sources for palavra in search_terms])
+
+    comando = [sys.executable, os.path.abspath(__file__), '--modo', 'worker', '--fila', fila_url, *args_worker]
+    processos = [subprocess.Popen(comando) for _ in range(workers)]
+    logger.info("Execução %s na fila '%s' com %s workers locais.", execucao, fila_url, workers)
+
+    try:
+        resumo = fila_tarefas.aguardar_execucao(fila, execucao, processos=processos)
+    finally:
+        for processo in processos:
+            try:
+                processo.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                processo.terminate()
+
+    if resumo.get('ERRO'):
+        logger.warning("%s tarefas da execução %s falharam após o limite de tentativas.", resumo['ERRO'], execucao)
+    return [Noticia.de_dict(dados) for dados in fila.resultados(execucao)]
+
+# Worker: consome tarefas da fila com um navegador próprio
+def run_worker(fila_url, gerenciador, lease=600, aguardar=False):
+    fila = fila_tarefas.abrir_fila(fila_url)
+
+    def executar_tarefa(tarefa):
+        execucao = fila.execucao(tarefa['execucao']) or {}
+        ide_execucao = execucao.get('ide_banco') or tarefa['execucao']
+        news = []
+        with contexto_log(fonte=tarefa['fonte'], termo=tarefa['termo'], ide_execucao=ide_execucao):
+            collect_news_for_term(gerenciador, tarefa['termo'], tarefa['fonte'], set(), news,
+                                  extrair_municipios=tarefa['extrair_municipios'])
+        return [noticia.como_dict() for noticia in news]
+
+    with gerenciador:
+        return fila_tarefas.processar_tarefas(fila, executar_tarefa, lease=lease, aguardar=aguardar)
+
 # Função para processar e salvar as notícias em Excel
-def process_and_save_news(news, output_file, con=None, table=None, ide_execucao=None):
-    print(f"Quantidade total de notícias únicas encontradas e processadas: {len(news)}")
+def process_and_save_news(news, output_file, gravador=None, table=None, ide_execucao=None):
+    logger.info("Quantidade total de notícias únicas encontradas e processadas: %s", len(news))
 
     if news:
         try:
-            df = pd.DataFrame(news)
             excel_filename = f"{output_file}_{datetime.now().strftime('%Y-%m-%d_%H%M')}"
             if not excel_filename.lower().endswith('.xlsx'):
                 excel_filename += '.xlsx'
-            dfProcessado = pos_processamento.processar_linhas(df)
-            dfProcessado.to_excel(excel_filename, index=False)
-            print(f"✅ Dados exportados para '{excel_filename}'.")
+            # Uma linha por município, montada por colunas direto dos registros
+            colunas = expandir_municipios(news)
+            para_dataframe(colunas).to_excel(excel_filename, index=False)
+            logger.info("✅ Dados exportados para '%s'.", excel_filename)
 
-            if con:
-                db.salvar_noticias(con, dfProcessado, ide_execucao)
+            if gravador:
+                gravador.salvar_noticias(colunas, ide_execucao)
         except Exception as e:
-            print(f"Erro ao exportar dados: {e}")
-            if con and ide_execucao:
-                db.registrar_erro(ide_execucao, str(e), con)
+            logger.error("Erro ao exportar dados: %s", e)
+            if gravador and ide_execucao:
+                gravador.registrar_erro(ide_execucao, str(e))
 
 # Função principal
-def main(search_terms, output_file, search_terms_txt, sources=['google_news'], use_proxy=False, use_db=False, gerar_banco=False):
+def main(search_terms, output_file, search_terms_txt, sources=['google_news'], use_proxy=False, use_db=False, gerar_banco=False,
+         max_paginas_driver=50, limite_memoria_driver=None, prazo_tarefa=180, dir_perfil=None, processos_nlp=1,
+         fila=None, workers=1, args_worker=(), planejar_municipios=False,
+         buscar_artigos=False, cache_artigos=None, conexoes_por_host=2, cache_municipios_db=None,
+         conexoes_banco=2, lotes_pendentes_banco=8, cache_http_db=None):
     news = []
-    con = None
+    gravador = None
     ide_execucao = None
     
-    if use_db or gerar_banco:
+    if gerar_banco:
         con = db.abrirConexao(db_user, db_password, db_encoding, db_host)
         if con is None:
-            print("Não foi possível conectar ao banco de dados.")
+            logger.error("Não foi possível conectar ao banco de dados.")
             sys.exit(1)
+        db.criar_tabelas(con)
+        logger.info("Estrutura do banco de dados verificada/criada. Encerrando execução.")
+        sys.exit(0)
+
+    if use_db:
+        pool = db.criar_pool(db_user, db_password, db_encoding, db_host, maximo=max(conexoes_banco, 2))
+        if pool is None:
+            logger.error("Não foi possível conectar ao banco de dados.")
+            sys.exit(1)
+        # Uma conexão fica com as gravações em segundo plano e outra com os registros de execução
+        gravador = GravadorBanco(pool, db, threads=max(conexoes_banco - 1, 1), max_pendentes=lotes_pendentes_banco)
+        try:
+            gravador.executar(db.verificar_tabelas)
+        except Exception as e:
+            logger.error("Erro: %s", e)
+            gravador.encerrar()
+            sys.exit(1)
+        ide_execucao = gravador.registrar_inicio("CRAWLER_NOTICIAS", f"Busca por {len(search_terms)} termos")
+        definir_contexto(ide_execucao=ide_execucao)
             
-        if gerar_banco:
-            db.criar_tabelas(con)
-            print("Estrutura do banco de dados verificada/criada. Encerrando execução.")
-            sys.exit(0)
-            
-        if use_db:
-            try:
-                db.verificar_tabelas(con)
-            except Exception as e:
-                print(f"Erro: {e}")
-                sys.exit(1)
-            ide_execucao = db.registrar_inicio(con, "CRAWLER_NOTICIAS", f"Busca por {len(search_terms)} termos")
-            
+    pool_proxies = setup_proxy_pool(use_proxy)
+    gerenciador = GerenciadorDrivers(
+        functools.partial(setup_driver, use_proxy=use_proxy),
+        max_paginas=max_paginas_driver,
+        limite_memoria_mb=limite_memoria_driver,
+        prazo_tarefa=prazo_tarefa,
+        dir_perfil=dir_perfil,
+        pool_proxies=pool_proxies
+    )
+
+    cache_municipios.configurar(cache_municipios_db or None)
+    cache_http.configurar(cache_http_db or None)
+
+    # Com extração em lote ou artigos completos, os municípios são identificados após a coleta
+    extrair_na_coleta = processos_nlp <= 1 and not buscar_artigos
+
+    # Com os municípios já identificados, cada termo é gravado no banco enquanto a coleta continua
+    gravar_na_coleta = gravador is not None and extrair_na_coleta and not fila
+    ao_coletar = None
+    if gravar_na_coleta:
+        def ao_coletar(novas):
+            gravador.salvar_noticias(expandir_municipios(novas), ide_execucao)
+
     try:
-        for source in sources:
-            driver = setup_driver(use_proxy=use_proxy)
-            news += collect_news_from_source(driver, search_terms, source)
-        process_and_save_news(news, output_file, con=con, table=None, ide_execucao=ide_execucao)
+        if fila:
+            news = coordinate_queue(fila, search_terms, sources, ide_execucao=ide_execucao, workers=workers,
+                                    args_worker=args_worker, extrair_municipios=extrair_na_coleta)
+        else:
+            with gerenciador:
+                for source in sources:
+                    if planejar_municipios:
+                        news += collect_news_planned(gerenciador, search_terms, source,
+                                                     extrair_municipios=extrair_na_coleta, ao_coletar=ao_coletar)
+                    else:
+                        news += collect_news_from_source(gerenciador, search_terms, source,
+                                                         extrair_municipios=extrair_na_coleta, ao_coletar=ao_coletar)
+        links_conteudo_completo = set()
+        if buscar_artigos:
+            buscador = artigos.BuscadorArtigos(
+                cache=artigos.CacheArtigos(cache_artigos) if cache_artigos else None,
+                por_host=conexoes_por_host
+            )
+            links_conteudo_completo = artigos.enriquecer_noticias(news, buscador)
+        if not extrair_na_coleta:
+            extracao_paralela.aplicar_municipios(news, processos=processos_nlp,
+                                                 links_conteudo_completo=links_conteudo_completo)
+        process_and_save_news(news, output_file, gravador=None if gravar_na_coleta else gravador, table=None,
+                              ide_execucao=ide_execucao)
+        logger.info("Cache de municípios: %s", cache_municipios.obter().resumo())
+        logger.info("Cache da validação de imagens: %s", cache_http.obter().resumo())
+        if pool_proxies is not None:
+            pool_proxies.registrar_relatorio()
         
-        if con and ide_execucao:
-            db.registrar_fim(ide_execucao, con)
+        if gravador and ide_execucao and not gravador.registrar_fim(ide_execucao):
+            # Lotes não gravados: a execução já ficou como ERRO no banco; o processo também termina com erro
+            sys.exit(1)
             
     except Exception as e:
-        if con and ide_execucao:
-            db.registrar_erro(ide_execucao, str(e), con)
+        if gravador and ide_execucao:
+            gravador.registrar_erro(ide_execucao, str(e))
         raise e
+    finally:
+        # Grava os lotes ainda na fila antes de encerrar (inclusive em caso de erro ou Ctrl+C)
+        if gravador:
+            gravador.encerrar()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -431,37 +622,197 @@ if __name__ == "__main__":
         "-db", "--database", type=str, default="false",
         help="Habilita o uso do banco de dados para salvar as notícias (ex: --database=true). Padrão é false."
     )
+    parser.add_argument(
+        "--max-paginas-driver", type=int, default=50,
+        help="Quantidade de páginas carregadas antes de reciclar o navegador. Padrão é 50."
+    )
+    parser.add_argument(
+        "--limite-memoria-driver", type=float, default=None,
+        help="Limite de memória (RSS do chromedriver e do Chrome, em MB) do navegador antes de reciclá-lo. Padrão é desativado."
+    )
+    parser.add_argument(
+        "--prazo-tarefa", type=int, default=180,
+        help="Prazo máximo em segundos para carregar cada busca; o navegador travado é substituído. Padrão é 180."
+    )
+    parser.add_argument(
+        "--dir-perfil", type=str, default=None,
+        help="Diretório de perfil persistente do Chrome para reaproveitar o cache entre execuções."
+    )
+    parser.add_argument(
+        "--processos-nlp", type=int, default=1,
+        help="Quantidade de processos para a identificação de municípios. Com valor maior que 1, "
+             "a extração é feita em lote após a coleta. Padrão é 1 (durante a coleta)."
+    )
+    parser.add_argument(
+        "--reprocessar", type=str, default=None,
+        help="Caminho de uma planilha exportada anteriormente para refazer a identificação de municípios "
+             "(usa --processos-nlp e grava o resultado com o prefixo de --saida)."
+    )
+    parser.add_argument(
+        "--planejar-municipios", action="store_true",
+        help="Trata os termos como tópicos e busca cada tópico combinado com os municípios da Bahia, "
+             "agrupados em consultas OR dentro dos limites da fonte."
+    )
+    parser.add_argument(
+        "--buscar-artigos", action="store_true",
+        help="Baixa o texto completo das notícias sem conteúdo (ex: Google News) para a coluna de conteúdo "
+             "e para a identificação de municípios."
+    )
+    parser.add_argument(
+        "--cache-artigos", type=str, default="cache_artigos.db",
+        help="Arquivo SQLite de cache dos artigos baixados (vazio para desativar). Padrão é cache_artigos.db."
+    )
+    parser.add_argument(
+        "--conexoes-por-host", type=int, default=2,
+        help="Máximo de downloads simultâneos de artigos por site. Padrão é 2."
+    )
+    parser.add_argument(
+        "--cache-municipios", type=str, default="cache_municipios.db",
+        help="Arquivo SQLite de cache da identificação de municípios entre execuções (vazio para manter só em memória). "
+             "Padrão é cache_municipios.db."
+    )
+    parser.add_argument(
+        "--cache-http", type=str, default="cache_http.db",
+        help="Arquivo SQLite de cache das respostas da validação de imagens, respeitando Cache-Control "
+             "(vazio para manter só em memória). Padrão é cache_http.db."
+    )
+    parser.add_argument(
+        "--conexoes-banco", type=int, default=2,
+        help="Tamanho do pool de conexões do banco. Uma conexão fica com os registros de execução e as demais "
+             "gravam as notícias em segundo plano. Padrão é 2."
+    )
+    parser.add_argument(
+        "--lotes-pendentes-banco", type=int, default=8,
+        help="Máximo de lotes aguardando gravação no banco; com a fila cheia, a coleta aguarda. Padrão é 8."
+    )
+    parser.add_argument(
+        "--fila", type=str, default=None,
+        help="Fila compartilhada de tarefas (caminho SQLite ou URL, ex: sqlite:///fila.db). "
+             "Ativa a coleta distribuída entre workers."
+    )
+    parser.add_argument(
+        "--modo", type=str, default="coordenador", choices=["coordenador", "worker"],
+        help="Com --fila: 'coordenador' enfileira os termos e junta os resultados; "
+             "'worker' consome tarefas da fila. Padrão é coordenador."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Quantidade de workers locais disparados pelo coordenador (0 para usar apenas workers externos). Padrão é 1."
+    )
+    parser.add_argument(
+        "--lease", type=int, default=600,
+        help="Tempo em segundos que uma tarefa fica reservada para um worker antes de voltar para a fila. Padrão é 600."
+    )
+    parser.add_argument(
+        "--aguardar", action="store_true",
+        help="No modo worker, continua aguardando novas tarefas quando a fila esvazia."
+    )
+    parser.add_argument(
+        "--nivel-log", type=str, default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Nível de log. DEBUG exibe o detalhe de cada notícia; INFO exibe o resumo por termo. Padrão é INFO."
+    )
+    parser.add_argument(
+        "--log-json", action="store_true",
+        help="Emite os logs em JSON (uma linha por registro) com fonte, termo e ide_execucao."
+    )
+    parser.add_argument(
+        "--arquivo-log", type=str, default=None,
+        help="Grava os logs neste arquivo em vez da saída padrão."
+    )
     parser.add_argument(
         "--gerar-banco", action="store_true",
         help="Cria as tabelas necessárias no banco de dados configurado no .env e encerra a execução."
     )
 
     args = parser.parse_args()
+    configurar_logs(args.nivel_log, formato_json=args.log_json, arquivo=args.arquivo_log)
     
     if args.gerar_banco:
         main([], "", "", sources=[], use_proxy=False, use_db=False, gerar_banco=True)
         sys.exit(0)
 
+    use_proxy = args.proxy.lower() == 'true'
+
+    if args.modo == 'worker':
+        if not args.fila:
+            parser.error("o argumento --fila é obrigatório com --modo worker")
+        pool_proxies = setup_proxy_pool(use_proxy)
+        gerenciador = GerenciadorDrivers(
+            functools.partial(setup_driver, use_proxy=use_proxy),
+            max_paginas=args.max_paginas_driver,
+            limite_memoria_mb=args.limite_memoria_driver,
+            prazo_tarefa=args.prazo_tarefa,
+            dir_perfil=args.dir_perfil,
+            pool_proxies=pool_proxies
+        )
+        cache_municipios.configurar(args.cache_municipios or None)
+        cache_http.configurar(args.cache_http or None)
+        run_worker(args.fila, gerenciador, lease=args.lease, aguardar=args.aguardar)
+        logger.info("Cache de municípios: %s", cache_municipios.obter().resumo())
+        logger.info("Cache da validação de imagens: %s", cache_http.obter().resumo())
+        if pool_proxies is not None:
+            pool_proxies.registrar_relatorio()
+        sys.exit(0)
+
+    if args.reprocessar:
+        if not args.saida:
+            parser.error("o argumento -s/--saida é obrigatório com --reprocessar")
+        cache_municipios.configurar(args.cache_municipios or None)
+        news = extracao_paralela.reprocessar_planilha(args.reprocessar, processos=max(args.processos_nlp, 1))
+        process_and_save_news(news, args.saida)
+        sys.exit(0)
+
+    if args.fila and args.planejar_municipios:
+        # A divisão adaptativa dos grupos depende do resultado de cada busca, feita no mesmo processo
+        parser.error("--planejar-municipios não pode ser combinado com --fila")
+    if args.planejar_municipios:
+        sem_or = [fonte for fonte in args.fonte if not SOURCE_CONFIG.get(fonte, {}).get('query_or', False)]
+        if sem_or:
+            # Sem OR cada município seria uma busca própria: 417 × tópicos carregamentos de página
+            parser.error(f"--planejar-municipios exige fontes que aceitem consultas OR; remova: {', '.join(sem_or)}")
+
     if not args.termos or not args.saida:
         parser.error("os seguintes argumentos são obrigatórios: -t/--termos, -s/--saida (a menos que use --gerar-banco)")
 
     errors = False
     search_terms_txt = args.termos
     output_file = args.saida
-    use_proxy = args.proxy.lower() == 'true'
     use_db = args.database.lower() == 'true'
 
     try:
         with open(search_terms_txt, 'r', encoding='utf-8') as f:
             lines = [line.strip() for line in f if line.strip()]
     except FileNotFoundError:
-        print(f"Arquivo de termos não encontrado: {search_terms_txt}")
+        logger.error("Arquivo de termos não encontrado: %s", search_terms_txt)
         errors = True
         sys.exit(1)
     except Exception as e:
-        print(f"Erro ao ler o arquivo de termos '{search_terms_txt}': {e}")
+        logger.error("Erro ao ler o arquivo de termos '%s': %s", search_terms_txt, e)
         errors = True
         sys.exit(1)
 
+    # Opções repassadas aos workers locais disparados pelo coordenador
+    args_worker = [
+        '-p', args.proxy,
+        '--max-paginas-driver', str(args.max_paginas_driver),
+        '--prazo-tarefa', str(args.prazo_tarefa),
+        '--lease', str(args.lease),
+        '--nivel-log', args.nivel_log,
+    ]
+    if args.limite_memoria_driver:
+        args_worker += ['--limite-memoria-driver', str(args.limite_memoria_driver)]
+    if args.dir_perfil:
+        args_worker += ['--dir-perfil', args.dir_perfil]
+    args_worker += ['--cache-municipios', args.cache_municipios, '--cache-http', args.cache_http]
+    if args.log_json:
+        args_worker.append('--log-json')
+
     if not errors:
-        main(lines, output_file, search_terms_txt, args.fonte, use_proxy=use_proxy, use_db=use_db, gerar_banco=False)
\ No newline at end of file
+        main(lines, output_file, search_terms_txt, args.fonte, use_proxy=use_proxy, use_db=use_db, gerar_banco=False,
+             max_paginas_driver=args.max_paginas_driver, limite_memoria_driver=args.limite_memoria_driver,
+             prazo_tarefa=args.prazo_tarefa, dir_perfil=args.dir_perfil, processos_nlp=args.processos_nlp,
+             fila=args.fila, workers=args.workers, args_worker=args_worker,
+             planejar_municipios=args.planejar_municipios, buscar_artigos=args.buscar_artigos,
+             cache_artigos=args.cache_artigos, conexoes_por_host=args.conexoes_por_host,
+             cache_municipios_db=args.cache_municipios, conexoes_banco=args.conexoes_banco,
+             lotes_pendentes_banco=args.lotes_pendentes_banco, cache_http_db=args.cache_http)
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# O código fica em src/ e é importado como `auxiliar.*` (mesmo layout de `python src/main.py`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
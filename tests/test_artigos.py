@@ -0,0 +1,27 @@
+from auxiliar.artigos import BuscadorArtigos, url_publicador_google
+
+
+def test_url_publicador_pelo_atributo_data_n_au():
+    html = '<div data-n-au="https://g1.globo.com/ba/noticia.html"></div><a href="https://outro.com/x">x</a>'
+    assert url_publicador_google(html) == "https://g1.globo.com/ba/noticia.html"
+
+
+def test_url_publicador_pelo_link_canonico_ou_og_url():
+    canonico = '<link rel="canonical" href="https://www.correio24horas.com.br/noticia/1">'
+    og = '<meta property="og:url" content="https://bnews.com.br/noticia/2">'
+    assert url_publicador_google(canonico) == "https://www.correio24horas.com.br/noticia/1"
+    assert url_publicador_google(og) == "https://bnews.com.br/noticia/2"
+
+
+def test_url_publicador_ignora_links_quaisquer_e_do_google():
+    html = ('<link rel="canonical" href="https://news.google.com/articles/abc">'
+            '<a href="https://politica.exemplo.com/outra-materia">Leia também</a>')
+    assert url_publicador_google(html) is None
+
+
+def test_limite_proprio_para_a_pagina_do_google_news():
+    buscador = BuscadorArtigos(por_host=2, por_host_google=8)
+    google = buscador._semaforo("https://news.google.com/articles/abc")
+    publicador = buscador._semaforo("https://g1.globo.com/ba/noticia.html")
+    assert [google.acquire(blocking=False) for _ in range(9)] == [True] * 8 + [False]
+    assert [publicador.acquire(blocking=False) for _ in range(3)] == [True, True, False]
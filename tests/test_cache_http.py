@@ -0,0 +1,141 @@
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from auxiliar.cache_http import CacheHTTP, calcular_expiracao
+from auxiliar.servidor_sintetico import iniciar_servidor
+
+AGORA = 1_000_000.0
+
+
+def _expira(cabecalhos, ttl_padrao=3600, ttl_maximo=86400):
+    return calcular_expiracao(cabecalhos, AGORA, ttl_padrao, ttl_maximo)
+
+
+def test_no_store_nao_armazena_e_no_cache_expira_na_hora():
+    assert _expira({'Cache-Control': 'no-store, max-age=600'}) is None
+    assert _expira({'Cache-Control': 'No-Cache'}) == AGORA
+
+
+def test_max_age_desconta_age_e_s_maxage_tem_prioridade():
+    assert _expira({'Cache-Control': 'public, max-age=600', 'Age': '100'}) == AGORA + 500
+    assert _expira({'Cache-Control': 'max-age=600, s-maxage=60'}) == AGORA + 60
+    # Age maior que max-age: já expirado, nunca no passado
+    assert _expira({'Cache-Control': 'max-age=60', 'Age': '300'}) == AGORA
+
+
+def test_expires_valido_invalido_e_padrao():
+    assert _expira({'Expires': formatdate(AGORA + 120, usegmt=True)}) == pytest.approx(AGORA + 120)
+    assert _expira({'Expires': '0'}) == AGORA
+    assert _expira({}) == AGORA + 3600
+    # max-age prevalece sobre Expires
+    assert _expira({'Cache-Control': 'max-age=10', 'Expires': '0'}) == AGORA + 10
+
+
+def test_expiracao_limitada_ao_ttl_maximo():
+    assert _expira({'Cache-Control': 'max-age=31536000'}) == AGORA + 86400
+
+
+class _Resposta:
+    def __init__(self, status_code=200, headers=None, url="https://exemplo.com/foto.jpg"):
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {'Content-Type': 'image/jpeg'}
+        self.url = url
+
+
+class _Requisitar:
+    """Devolve as respostas em sequência e guarda os cabeçalhos enviados."""
+
+    def __init__(self, *respostas):
+        self.respostas = list(respostas)
+        self.enviados = []
+
+    def __call__(self, cabecalhos):
+        self.enviados.append(cabecalhos)
+        resposta = self.respostas.pop(0)
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+
+def test_rejeitada_fica_em_cache_negativo_ate_o_ttl_negativo():
+    url = "https://exemplo.com/pagina.jpg"
+    html = _Resposta(headers={'Content-Type': 'text/html'})
+
+    cache = CacheHTTP(ttl_negativo=60)
+    requisitar = _Requisitar(html)
+    assert cache.validar_imagem(url, requisitar) is None
+    assert cache.validar_imagem(url, requisitar) is None
+    assert len(requisitar.enviados) == 1
+    assert cache.estatisticas['negativos'] == 1
+
+    # Vencido o TTL negativo a URL é consultada de novo, sem requisição condicional
+    cache = CacheHTTP(ttl_negativo=0)
+    requisitar = _Requisitar(html, _Resposta(404, {'Content-Type': 'text/plain', 'ETag': '"x"'}))
+    assert cache.validar_imagem(url, requisitar) is None
+    assert cache.validar_imagem(url, requisitar) is None
+    assert len(requisitar.enviados) == 2
+    assert 'If-None-Match' not in requisitar.enviados[1]
+
+
+def test_erro_de_rede_fica_em_cache_negativo():
+    cache = CacheHTTP(ttl_negativo=60)
+    requisitar = _Requisitar(requests.ConnectionError("recusada"))
+    assert cache.validar_imagem("https://exemplo.com/a.jpg", requisitar) is None
+    assert cache.validar_imagem("https://exemplo.com/a.jpg", requisitar) is None
+    assert cache.estatisticas['erros'] == 1
+    assert cache.estatisticas['negativos'] == 1
+
+
+def test_no_store_nao_fica_em_cache():
+    url = "https://exemplo.com/foto.jpg"
+    resposta = _Resposta(headers={'Content-Type': 'image/jpeg', 'Cache-Control': 'no-store'})
+    requisitar = _Requisitar(resposta, resposta)
+    cache = CacheHTTP()
+    assert cache.validar_imagem(url, requisitar) == url
+    assert cache.validar_imagem(url, requisitar) == url
+    assert len(requisitar.enviados) == 2
+    assert cache.buscar(url) is None
+
+
+def test_validas_persistem_entre_execucoes(tmp_path):
+    caminho = str(tmp_path / 'cache_http.db')
+    url = "https://exemplo.com/foto.jpg"
+    requisitar = _Requisitar(_Resposta(headers={'Content-Type': 'image/png', 'Cache-Control': 'max-age=600'},
+                                       url="https://cdn.exemplo.com/foto.png"))
+    assert CacheHTTP(caminho).validar_imagem(url, requisitar) == "https://cdn.exemplo.com/foto.png"
+
+    cache = CacheHTTP(caminho)
+    assert cache.validar_imagem(url, requisitar) == "https://cdn.exemplo.com/foto.png"
+    assert len(requisitar.enviados) == 1
+    assert cache.estatisticas == {'validos': 1, 'negativos': 0, 'revalidados': 0, 'requisicoes': 0, 'erros': 0}
+
+
+@pytest.fixture
+def servidor():
+    # max-age=0: toda consulta depois da primeira é uma revalidação com If-None-Match
+    servidor = iniciar_servidor(taxa_imagem_invalida=0.0, taxa_imagem_erro=0.0, max_age_imagem=0)
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_revalidacao_com_304_no_servidor_sintetico(servidor, tmp_path):
+    url = f"{servidor.url}/img/abc.jpg"
+
+    def requisitar(cabecalhos):
+        return requests.head(url, headers=cabecalhos, allow_redirects=True, timeout=5)
+
+    cache = CacheHTTP(str(tmp_path / 'cache_http.db'))
+    assert cache.validar_imagem(url, requisitar) == url
+    assert cache.buscar(url).etag == '"abc.jpg"'
+    assert cache.validar_imagem(url, requisitar) == url
+    assert cache.validar_imagem(url, requisitar) == url
+
+    assert servidor.requisicoes['img'] == 3
+    assert cache.estatisticas['requisicoes'] == 3
+    assert cache.estatisticas['revalidados'] == 2
+    # A entrada revalidada continua válida (com a URL final da primeira resposta)
+    entrada = CacheHTTP(str(tmp_path / 'cache_http.db')).buscar(url)
+    assert entrada.valida and entrada.url_final == url
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from auxiliar.fila_tarefas import FilaSQLite, FilaTarefas, abrir_fila
+
+
+@pytest.fixture
+def fila(tmp_path):
+    return FilaSQLite(str(tmp_path / 'fila.db'), max_tentativas=2)
+
+
+def _nova(fila, tarefas=(('google_news', 'fraude'),)):
+    execucao = fila.nova_execucao()
+    fila.enfileirar(execucao, list(tarefas))
+    return execucao
+
+
+def test_lease_vencido_volta_para_outro_worker(fila):
+    execucao = _nova(fila)
+    tarefa = fila.reservar('w1', lease=0.1)
+    assert fila.reservar('w2', lease=60) is None
+
+    time.sleep(0.2)
+    retomada = fila.reservar('w2', lease=60)
+    assert retomada['tarefa_id'] == tarefa['tarefa_id']
+    assert retomada['tentativa'] == 2
+    # O primeiro worker perdeu o lease e não pode mais renová-lo nem falhar a tarefa
+    assert not fila.renovar(tarefa['tarefa_id'], 'w1', lease=60)
+    fila.falhar(tarefa['tarefa_id'], 'w1', 'atrasado')
+    assert fila.resumo(execucao) == {'EM_ANDAMENTO': 1}
+
+
+def test_renovar_mantem_o_lease(fila):
+    _nova(fila)
+    tarefa = fila.reservar('w1', lease=0.2)
+    time.sleep(0.1)
+    assert fila.renovar(tarefa['tarefa_id'], 'w1', lease=60)
+    time.sleep(0.2)
+    assert fila.reservar('w2', lease=60) is None
+
+
+def test_falhar_devolve_ate_o_limite_de_tentativas(fila):
+    execucao = _nova(fila)
+    tarefa = fila.reservar('w1', lease=60)
+    fila.falhar(tarefa['tarefa_id'], 'w1', 'timeout')
+    assert fila.resumo(execucao) == {'PENDENTE': 1}
+
+    tarefa = fila.reservar('w1', lease=60)
+    assert tarefa['tentativa'] == 2
+    fila.falhar(tarefa['tarefa_id'], 'w1', 'timeout')
+    assert fila.resumo(execucao) == {'ERRO': 1}
+    assert fila.reservar('w1', lease=60) is None
+    assert fila.em_aberto(execucao) == 0
+
+
+def test_lease_vencido_apos_o_limite_vira_erro(fila):
+    execucao = _nova(fila)
+    fila.reservar('w1', lease=0.05)
+    time.sleep(0.1)
+    fila.reservar('w2', lease=0.05)
+    time.sleep(0.1)
+    assert fila.reservar('w3', lease=60) is None
+    assert fila.resumo(execucao) == {'ERRO': 1}
+
+
+def test_concluir_idempotente_e_resultados_deduplicados(fila):
+    execucao = _nova(fila, [('google_news', 'fraude'), ('portal_atarde', 'fraude')])
+    primeira = fila.reservar('w1', lease=60)
+    segunda = fila.reservar('w2', lease=60)
+    itens = [{'link': 'https://exemplo.com/1', 'titulo': 'A'}, {'link': 'https://exemplo.com/2', 'titulo': 'B'}]
+
+    assert fila.concluir(primeira['tarefa_id'], 'w1', itens)
+    # Reenvio da mesma tarefa (ex: resposta perdida) não duplica nada
+    assert not fila.concluir(primeira['tarefa_id'], 'w1', itens)
+    assert fila.concluir(segunda['tarefa_id'], 'w2', [{'link': 'https://exemplo.com/2', 'titulo': 'B'},
+                                                       {'link': 'https://exemplo.com/3', 'titulo': 'C'}])
+
+    assert fila.resumo(execucao) == {'CONCLUIDA': 2}
+    assert [item['titulo'] for item in fila.resultados(execucao)] == ['A', 'B', 'C']
+
+
+def test_enfileirar_ignora_tarefas_repetidas(fila):
+    execucao = _nova(fila, [('google_news', 'fraude'), ('google_news', 'fraude')])
+    fila.enfileirar(execucao, [('google_news', 'fraude')])
+    assert fila.em_aberto(execucao) == 1
+
+
+def test_abrir_fila_por_url(tmp_path):
+    caminho = tmp_path / 'fila.db'
+    assert isinstance(abrir_fila(f"sqlite:///{caminho}"), FilaSQLite)
+    with pytest.raises(ValueError):
+        abrir_fila("redis://localhost/0")
+
+
+def test_backend_incompleto_falha_ao_instanciar():
+    class FilaIncompleta(FilaTarefas):
+        def reservar(self, worker, lease):
+            return None
+
+    with pytest.raises(TypeError):
+        FilaIncompleta()
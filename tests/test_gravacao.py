@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from auxiliar import db_local
+from auxiliar.gravacao import GravadorBanco
+
+
+def _lote(prefixo, quantidade=3):
+    return {
+        'titulo': [f"{prefixo} notícia {i}" for i in range(quantidade)],
+        'conteudo': ['texto'] * quantidade,
+        'fonte': ['google_news'] * quantidade,
+        'datetime': ['2026-05-04 14:38:00'] * quantidade,
+        'link': [f"https://exemplo.com/{prefixo}/{i}" for i in range(quantidade)],
+        'img_url': [''] * quantidade,
+        'palavra_chave': ['Fraude Licitação'] * quantidade,
+        'municipios_citados': ['Salvador'] * quantidade,
+        'codigo_municipio': ['2927408'] * quantidade,
+    }
+
+
+class BackendLento:
+    """db_local com salvar_noticias retido até `liberar` (ou com atraso fixo)."""
+
+    def __init__(self, atraso=0.0):
+        self.atraso = atraso
+        self.liberar = threading.Event()
+        self.iniciados = threading.Semaphore(0)
+        self.liberar.set()
+
+    def salvar_noticias(self, con, dados, ide_execucao):
+        self.iniciados.release()
+        self.liberar.wait(5)
+        time.sleep(self.atraso)
+        db_local.salvar_noticias(con, dados, ide_execucao)
+
+    def __getattr__(self, nome):
+        return getattr(db_local, nome)
+
+
+@pytest.fixture
+def caminho_db(tmp_path):
+    caminho = str(tmp_path / 'noticias.db')
+    db_local.configurar(caminho)
+    return caminho
+
+
+def _contar(caminho, sql):
+    con = sqlite3.connect(caminho)
+    try:
+        return con.execute(sql).fetchone()[0]
+    finally:
+        con.close()
+
+
+def test_salvar_noticias_aguarda_com_fila_cheia(caminho_db):
+    backend = BackendLento()
+    backend.liberar.clear()
+    gravador = GravadorBanco(db_local.criar_pool(), backend, threads=1, max_pendentes=1)
+    try:
+        gravador.salvar_noticias(_lote('a'), None)
+        # A thread de gravação retirou o primeiro lote e está retida nele
+        assert backend.iniciados.acquire(timeout=5)
+        gravador.salvar_noticias(_lote('b'), None)  # ocupa a única vaga da fila
+
+        terceiro = threading.Thread(target=gravador.salvar_noticias, args=(_lote('c'), None))
+        terceiro.start()
+        terceiro.join(0.3)
+        assert terceiro.is_alive(), "salvar_noticias deveria aguardar com a fila cheia"
+
+        backend.liberar.set()
+        terceiro.join(5)
+        assert not terceiro.is_alive()
+    finally:
+        backend.liberar.set()
+        gravador.encerrar()
+    assert _contar(caminho_db, "SELECT COUNT(*) FROM NOTICIAS_MUNICIPIOS") == 9
+    assert gravador.estatisticas['tempo_espera'] > 0.2
+
+
+def test_encerrar_grava_lotes_pendentes(caminho_db):
+    gravador = GravadorBanco(db_local.criar_pool(), BackendLento(atraso=0.05), threads=2, max_pendentes=8)
+    for i in range(6):
+        gravador.salvar_noticias(_lote(f"lote{i}"), None)
+    gravador.encerrar()
+
+    assert _contar(caminho_db, "SELECT COUNT(*) FROM NOTICIAS_MUNICIPIOS") == 18
+    assert gravador.estatisticas['lotes'] == 6
+    assert gravador.estatisticas['falhas'] == 0
+    with pytest.raises(RuntimeError):
+        gravador.salvar_noticias(_lote('depois'), None)
+
+
+def test_registrar_fim_aguarda_lotes_pendentes(caminho_db):
+    gravador = GravadorBanco(db_local.criar_pool(), BackendLento(atraso=0.1), threads=1, max_pendentes=8)
+    try:
+        ide_execucao = gravador.registrar_inicio("CRAWLER_NOTICIAS", "teste")
+        for i in range(4):
+            gravador.salvar_noticias(_lote(f"lote{i}"), ide_execucao)
+        assert gravador.registrar_fim(ide_execucao) is True
+
+        # O status só é gravado depois que todos os lotes da execução estão no banco
+        assert _contar(caminho_db, "SELECT COUNT(*) FROM NOTICIAS_MUNICIPIOS") == 12
+        assert _contar(caminho_db, f"SELECT STATUS FROM LOG_EXECUCAO_NOTICIAS "
+                                   f"WHERE IDE_EXECUCAO = {ide_execucao}") == 'CONCLUIDO'
+    finally:
+        gravador.encerrar()
+
+
+def test_lote_repetido_nao_conta_duas_vezes_no_resumo(caminho_db):
+    with GravadorBanco(db_local.criar_pool(), db_local, threads=2) as gravador:
+        gravador.salvar_noticias(_lote('a'), None)
+        gravador.salvar_noticias(_lote('a'), None)
+
+    assert _contar(caminho_db, "SELECT COUNT(*) FROM NOTICIAS_MUNICIPIOS") == 6
+    assert _contar(caminho_db, "SELECT COUNT(*) FROM MENCOES_MUNICIPIOS") == 3
+    assert _contar(caminho_db, "SELECT SUM(QTD_NOTICIAS) FROM RESUMO_MUNICIPIOS") == 3
+
+
+def test_lote_com_erro_marca_execucao_como_erro(caminho_db):
+    gravador = GravadorBanco(db_local.criar_pool(), db_local, threads=1)
+    try:
+        ide_execucao = gravador.registrar_inicio("CRAWLER_NOTICIAS", "teste")
+        # Falha real do banco em um dos lotes: a transação é desfeita e o erro chega ao gravador
+        con = sqlite3.connect(caminho_db)
+        con.execute("""
+            CREATE TRIGGER RECUSAR_LOTE BEFORE INSERT ON NOTICIAS_MUNICIPIOS
+            WHEN NEW.TITULO LIKE 'ruim%' BEGIN SELECT RAISE(ABORT, 'lote recusado'); END
+        """)
+        con.commit()
+        con.close()
+        gravador.salvar_noticias(_lote('bom'), ide_execucao)
+        gravador.salvar_noticias(_lote('ruim'), ide_execucao)
+        assert gravador.registrar_fim(ide_execucao) is False
+    finally:
+        gravador.encerrar()
+
+    assert gravador.estatisticas['falhas'] == 1
+    assert gravador.estatisticas['linhas'] == 3
+    assert gravador.estatisticas['linhas_perdidas'] == 3
+    # Nada do lote recusado ficou pela metade no banco
+    assert _contar(caminho_db, "SELECT COUNT(*) FROM NOTICIAS_MUNICIPIOS") == 3
+    assert _contar(caminho_db, "SELECT COUNT(*) FROM MENCOES_MUNICIPIOS") == 3
+    assert _contar(caminho_db, f"SELECT STATUS FROM LOG_EXECUCAO_NOTICIAS "
+                               f"WHERE IDE_EXECUCAO = {ide_execucao}") == 'ERRO'
+    assert 'lote recusado' in _contar(caminho_db, f"SELECT DES_ERRO FROM LOG_EXECUCAO_NOTICIAS "
+                                                  f"WHERE IDE_EXECUCAO = {ide_execucao}")
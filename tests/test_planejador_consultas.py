@@ -0,0 +1,78 @@
+import pytest
+
+from auxiliar.planejador_consultas import (GrupoConsulta, PlanejadorConsultas, agrupar_municipios,
+                                           montar_consulta, normalizar_topico)
+
+MUNICIPIOS = ["Salvador", "Feira de Santana", "Vitória da Conquista", "Irecê", "Jacobina", "Xique-Xique",
+              "Santo Antônio de Jesus", "Ilhéus", "Bom Jesus da Lapa", "Juazeiro"]
+
+
+def _todos(grupos):
+    return sorted(m for grupo in grupos for m in grupo)
+
+
+def test_normalizar_topico_remove_sufixo_bahia():
+    assert normalizar_topico("Fraude Licitação Bahia") == "Fraude Licitação"
+    assert normalizar_topico("Bahia") == "Bahia"
+
+
+def test_montar_consulta():
+    assert montar_consulta("Fraude", ["Irecê"]) == 'Fraude "Irecê"'
+    assert montar_consulta("Fraude", ["Irecê", "Jacobina"]) == 'Fraude ("Irecê" OR "Jacobina")'
+
+
+def test_agrupar_respeita_limite_de_caracteres():
+    grupos = agrupar_municipios("Fraude", MUNICIPIOS, max_caracteres=60)
+    assert _todos(grupos) == sorted(MUNICIPIOS)
+    assert len(grupos) > 1
+    assert all(len(montar_consulta("Fraude", grupo)) <= 60 for grupo in grupos)
+
+
+def test_agrupar_respeita_limite_de_palavras():
+    grupos = agrupar_municipios("Fraude Licitação", MUNICIPIOS, max_palavras=10)
+    assert _todos(grupos) == sorted(MUNICIPIOS)
+    assert all(len(montar_consulta("Fraude Licitação", grupo).split()) <= 10 for grupo in grupos)
+
+
+def test_agrupar_sem_limites_gera_um_grupo():
+    assert len(agrupar_municipios("Fraude", MUNICIPIOS)) == 1
+
+
+def test_municipio_maior_que_o_limite_fica_sozinho():
+    grupos = agrupar_municipios("Fraude", ["Santo Antônio de Jesus", "Irecê"], max_caracteres=20)
+    assert sorted(map(tuple, grupos)) == [("Irecê",), ("Santo Antônio de Jesus",)]
+
+
+def test_registrar_divide_grupo_saturado():
+    planejador = PlanejadorConsultas(["Fraude Bahia"], MUNICIPIOS[:4], limite_saturacao=90)
+    grupo = next(iter(planejador))
+    assert len(grupo.municipios) == 4
+
+    planejador.registrar(grupo, 95)
+    metade_a, metade_b = list(planejador)
+    assert (metade_a.municipios, metade_b.municipios) == (grupo.municipios[:2], grupo.municipios[2:])
+    assert metade_a.nivel == metade_b.nivel == 1
+    assert planejador.resumo() == {'combinacoes': 4, 'consultas_planejadas': 1,
+                                   'consultas_executadas': 1, 'divisoes': 1}
+
+
+def test_registrar_nao_divide_abaixo_da_saturacao_nem_grupo_unitario():
+    planejador = PlanejadorConsultas(["Fraude"], MUNICIPIOS[:2], limite_saturacao=90)
+    grupo = next(iter(planejador))
+    planejador.registrar(grupo, 89)
+    planejador.registrar(GrupoConsulta("Fraude", ["Irecê"]), 100)
+    assert list(planejador) == []
+    assert planejador.divisoes == 0
+
+
+def test_divisoes_voltam_para_o_inicio_da_fila():
+    planejador = PlanejadorConsultas(["Fraude"], MUNICIPIOS, max_caracteres=80)
+    iterador = iter(planejador)
+    primeiro = next(iterador)
+    planejador.registrar(primeiro, 100)
+    assert next(iterador).municipios == primeiro.municipios[:len(primeiro.municipios) // 2]
+
+
+def test_fonte_sem_or_e_rejeitada():
+    with pytest.raises(ValueError):
+        PlanejadorConsultas.para_fonte(["Fraude"], MUNICIPIOS, {'query_or': False})
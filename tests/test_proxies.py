@@ -0,0 +1,107 @@
+import socket
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import pytest
+import requests
+
+from auxiliar.proxies import PoolProxies
+from auxiliar.proxy_local import iniciar_proxy
+
+
+class _Destino(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture(autouse=True)
+def sem_no_proxy(monkeypatch):
+    # NO_PROXY com localhost faria o requests ignorar os proxies locais
+    for nome in ('NO_PROXY', 'no_proxy', 'HTTP_PROXY', 'http_proxy', 'HTTPS_PROXY', 'https_proxy'):
+        monkeypatch.delenv(nome, raising=False)
+
+
+@pytest.fixture
+def destino():
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Destino)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}/generate_204"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def proxies_locais():
+    servidores = []
+
+    def iniciar(**kwargs):
+        servidor = iniciar_proxy(**kwargs)
+        servidores.append(servidor)
+        return servidor
+
+    yield iniciar
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_verificacao_de_saude_ejeta_proxy_inacessivel(destino, proxies_locais):
+    ativo = proxies_locais()
+    inativo = f"http://127.0.0.1:{_porta_livre()}"
+    pool = PoolProxies([ativo.url, inativo], url_teste=destino, timeout_teste=2)
+
+    assert pool.verificar_saude() == 1
+    assert {pool.escolher().url for _ in range(4)} == {ativo.url}
+    assert ativo.requisicoes >= 1
+
+
+def test_requisitar_alterna_entre_proxies(destino, proxies_locais):
+    a, b = proxies_locais(), proxies_locais()
+    pool = PoolProxies([a.url, b.url])
+
+    for _ in range(4):
+        assert pool.requisitar(requests.get, destino, timeout=5).status_code == 204
+    assert (a.requisicoes, b.requisicoes) == (2, 2)
+    assert all(linha['erros'] == 0 for linha in pool.relatorio())
+
+
+def test_throttle_ejeta_o_proxy(destino, proxies_locais):
+    limitado = proxies_locais(taxa_throttle=1.0)
+    normal = proxies_locais()
+    pool = PoolProxies([limitado.url, normal.url], tempo_ejecao=60)
+
+    assert pool.requisitar(requests.get, destino, timeout=5).status_code == 429
+    # Com o proxy limitado ejetado, as próximas requisições vão todas pelo outro
+    for _ in range(3):
+        assert pool.requisitar(requests.get, destino, timeout=5).status_code == 204
+    assert limitado.requisicoes == 1
+    relatorio = {linha['proxy']: linha for linha in pool.relatorio()}
+    assert relatorio[limitado.url]['throttles'] == 1
+    assert relatorio[limitado.url]['ejecoes'] == 1
+
+
+def test_falhas_seguidas_ejetam_o_proxy(destino):
+    pool = PoolProxies([f"http://127.0.0.1:{_porta_livre()}"], max_falhas=2, tempo_ejecao=60)
+    proxy = pool.proxies[0]
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ProxyError):
+            pool.requisitar(requests.get, destino, timeout=2)
+    assert not proxy.disponivel()
+    assert proxy.erros == 2
+    # Sem proxy disponível, o pool devolve o que volta primeiro
+    assert pool.escolher() is proxy